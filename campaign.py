@@ -0,0 +1,346 @@
+""" Campaign runner for determining delay-defining paths for PRNG input vectors on several processes.
+
+A campaign applies the PRNG vectors with offsets PRNG_offset to PRNG_offset + PRNG_num - 1 (see
+Pathset.make_db_node_values('PRNG', ...)) and determines the delay-defining paths of all output pins for each of them.
+The range of offsets is split into shards, which are analyzed by a pool of worker processes. Each worker builds its
+Pathset once, with the options of the Pathset of the calling process (compile_evaluator, dd_cache_size), and the netlist
+is loaded from the netlist cache, which the Pathset of the calling process has written. Workers analyze the circuit as
+loaded, so a Pathset with circuit mods (see Pathset.mod_insert) is rejected unless the campaign runs in the calling
+process.
+
+Results of the shards are merged in order of PRNG offset, then of output pin, skipping results already in db_results,
+exactly as a serial run of dd_paths_iterative would add them. The db_results, and so the file written by
+write_results(), are therefore identical to those of a serial run, independent of the number of processes.
+
+The run_prng_campaign() function runs a campaign and adds its results to the db_results of a Pathset.
+
+The prng_shards() function splits a range of PRNG offsets into shards.
+
+The dd_paths_parallel() function determines the delay-defining paths of (vector, output pin) work items on a
+concurrent.futures process pool, and yields the results in order of the work items as they become available. Each work
+item is scheduled on its own, so an output pin with an exploding set of paths only occupies one worker while the others
+go on with the next work items. The netlist is sent to each worker once, when the worker starts.
+
+The run_guided_campaign() function applies vectors chosen among random candidates to cover the nodes not covered yet,
+instead of blind PRNG vectors, and stops when the coverage gain saturates.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import multiprocessing
+import random
+
+import pathsets
+
+# Pathset of a worker process, built once by _init_worker.
+_pathset = None
+
+
+def prng_shards(PRNG_offset, PRNG_num, shard_size):
+    """
+    Returns a list of shards, i.e. 2tuples of (first PRNG offset, number of vectors), which cover the PRNG_num offsets
+    starting at PRNG_offset in order.
+    """
+
+    return [(offset, min(shard_size, PRNG_offset + PRNG_num - offset))
+            for offset in range(PRNG_offset, PRNG_offset + PRNG_num, shard_size)]
+
+
+def _worker_options(pathset, caller):
+    """
+    Returns the keyword arguments to build the Pathset of a worker process with the options of pathset.
+
+    Workers build their Pathset from the verilog code or netlist, which does not hold the circuit mods of pathset, so
+    caller raises a ValueError for a pathset with circuit mods rather than analyze the unmodified circuit.
+    """
+
+    if pathset.db_mods_circuit.mod_num or pathset.db_mods_circuit.array:
+        raise ValueError(caller + " cannot run a Pathset with circuit mods on worker processes; run it with "
+                         "processes=1, or before adding the mods.")
+
+    return {'compile_evaluator': pathset.evaluator is not None, 'dd_cache_size': pathset.db_dd_cache.size}
+
+
+def _init_worker(circuit, verilog_path, netlist_cache, options):
+    """
+    Build the Pathset of a worker process.
+    """
+
+    global _pathset
+    _pathset = pathsets.Pathset(circuit, verilog_path, netlist_cache, **options)
+
+
+def _init_dd_worker(circuit, netlist, options):
+    """
+    Build the Pathset of a worker process of dd_paths_parallel from the netlist of the calling process.
+    """
+
+    global _pathset
+    _pathset = pathsets.Pathset(circuit, '', netlist_cache=False, netlist=netlist, **options)
+
+
+def _run_dd_item(input_string, output_pin, pathset=None):
+    """
+    Determine the delay-defining paths of a work item of dd_paths_parallel.
+
+    input_string: input string of the vector, i.e. the values of the input pins in natural order, e.g. '10010'.
+    output_pin: output pin to analyze.
+    pathset: Pathset to use; by default, that of the worker process.
+
+    Returns the db_result of output_pin. Consecutive work items of the same vector only evaluate the node values once,
+    and node values are updated event-driven between vectors (see Pathset.update_db_node_values).
+    """
+
+    if pathset is None:
+        pathset = _pathset
+
+    input_pin_list_sorted = pathset.netlist.natural_sorted(pathset.db_input_pins)
+    if len(input_string) != len(input_pin_list_sorted):
+        raise ValueError("dd_paths_parallel received input string " + input_string + " for " +
+                         str(len(input_pin_list_sorted)) + " input pins.")
+
+    if not pathset.db_node_value_list or pathset.input_string() != input_string:
+        pathset.update_db_node_values({pin: int(value) for pin, value in zip(input_pin_list_sorted, input_string)})
+
+    return pathset.dd_result(output_pin, input_string)
+
+
+def _run_shard(shard, PRNG_seed, output_pins, pathset=None):
+    """
+    Determine the delay-defining paths for the vectors of a shard.
+
+    shard: 2tuple of (first PRNG offset, number of vectors).
+    PRNG_seed: Seed for PRNG
+    output_pins: list of output pins to analyze, in order.
+    pathset: Pathset to use; by default, that of the worker process.
+
+    Returns a list of db_results in order of PRNG offset, then of output_pins. Vectors with the same input string as an
+    earlier vector of the shard are skipped, as their results would not be added to db_results.
+    """
+
+    if pathset is None:
+        pathset = _pathset
+
+    PRNG_offset, PRNG_num = shard
+    pathset.make_db_node_bitmaps(pathset.prng_input_strings(PRNG_seed, PRNG_offset, PRNG_num))
+
+    results = []
+    input_strings = set()
+    for vector in range(PRNG_num):
+        pathset.make_db_node_values_bitmaps(vector)
+        input_string = pathset.input_string()
+        if input_string in input_strings:
+            continue
+        input_strings.add(input_string)
+
+        results += pathset.dd_paths_outputs(output_pins, save_results=False)
+
+    return results
+
+
+def run_prng_campaign(pathset, PRNG_seed=0, PRNG_offset=0, PRNG_num=1, processes=None, shard_size=None):
+    """
+    Determines the delay-defining paths of all output pins for PRNG_num PRNG vectors, on a pool of processes, and adds
+    the results to pathset.db_results in the same order as the serial run
+
+        for PRNG in range(PRNG_offset, PRNG_offset + PRNG_num):
+            pathset.make_db_node_values('PRNG', PRNG_seed, PRNG)
+            for outpin in pathset.db_output_pins:
+                pathset.dd_paths_iterative([[outpin]])
+
+    pathset: Pathset of the circuit. Workers build their own Pathset of the same circuit, with the same compile_evaluator
+    and dd_cache_size. A Pathset with circuit mods raises a ValueError unless processes is 1.
+    PRNG_seed: Seed for PRNG
+    PRNG_offset: Offset count of first vector.
+    PRNG_num: Number of vectors.
+    processes: Number of worker processes; by default, the number of CPUs. If 1, the campaign is run in this process
+    using pathset.
+    shard_size: Number of vectors per shard; by default, the vectors are split in four shards per process.
+    """
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if shard_size is None:
+        shard_size = max(1, -(-PRNG_num // (4 * processes)))
+
+    # Order of output pins of the serial run, i.e. of pathset.db_output_pins in this process.
+    output_pins = list(pathset.db_output_pins)
+    shards = prng_shards(PRNG_offset, PRNG_num, shard_size)
+
+    results_written = {(result.input_string, result.output_pin) for result in pathset.db_results}
+
+    def merge(shard, results):
+        for result in results:
+            if (result.input_string, result.output_pin) not in results_written:
+                results_written.add((result.input_string, result.output_pin))
+                pathset.save_db_result(result)
+
+        print(shard[0] + shard[1] - PRNG_offset, '/', PRNG_num)
+
+    if processes == 1:
+        for shard in shards:
+            merge(shard, _run_shard(shard, PRNG_seed, output_pins, pathset))
+        return
+
+    options = _worker_options(pathset, "run_prng_campaign")
+    pool = multiprocessing.Pool(processes, _init_worker,
+                                (pathset.circuit, pathset.verilog_path, pathset.netlist_cache, options))
+    try:
+        run_shard = functools.partial(_run_shard, PRNG_seed=PRNG_seed, output_pins=output_pins)
+        for shard, results in zip(shards, pool.imap(run_shard, shards)):
+            merge(shard, results)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def dd_paths_parallel(pathset, input_strings, output_pins=None, processes=None, max_pending=None, cancel=None):
+    """
+    Determines the delay-defining paths of output pins for vectors on a concurrent.futures process pool. Generator of
+    the db_results of the work items (input string, output pin), in order of input_strings, then of output_pins, which
+    are yielded as soon as they and all earlier work items are done. The results are those of
+
+        for input_string in input_strings:
+            (apply input_string to the input pins)
+            for outpin in output_pins:
+                pathset.dd_paths_iterative([[outpin]])
+
+    but they are not added to pathset.db_results; e.g. add them with
+
+        for result in campaign.dd_paths_parallel(pathset, input_strings):
+            if (result.input_string, result.output_pin) not in results_written:
+                ...
+
+    pathset: Pathset of the circuit. Its netlist is sent to each worker once, and workers build their own Pathset from
+    it with the same compile_evaluator and dd_cache_size. The netlist does not hold circuit mods (see mod_insert), so a
+    Pathset with circuit mods raises a ValueError.
+    input_strings: list of input strings, i.e. the values of the input pins in natural order, e.g. '10010'.
+    output_pins: list of output pins to analyze; by default, all output pins in natural order.
+    processes: Number of worker processes; by default, the number of CPUs.
+    max_pending: Maximum number of work items submitted to the pool but not yet yielded, which bounds the memory of
+    results waiting for a slow earlier work item; by default, all work items are submitted at once.
+    cancel: threading.Event, e.g. set by another thread; if set, the run is cancelled.
+
+    The run is cancelled when cancel is set, or when the generator is closed, e.g. by leaving a for loop over it early:
+    work items that have not started are cancelled, and the pool is shut down without waiting for running work items.
+    """
+
+    if output_pins is None:
+        output_pins = pathset.netlist.natural_sorted(pathset.db_output_pins)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    options = _worker_options(pathset, "dd_paths_parallel")
+    items = ((input_string, output_pin) for input_string in input_strings for output_pin in output_pins)
+    pending = collections.deque()
+
+    # Netlist tables made by the pathset, e.g. node depths, are sent with the netlist, so workers need not make them.
+    executor = concurrent.futures.ProcessPoolExecutor(processes, initializer=_init_dd_worker,
+                                                      initargs=(pathset.circuit, pathset.netlist, options))
+    try:
+        while True:
+            while max_pending is None or len(pending) < max_pending:
+                item = next(items, None)
+                if item is None:
+                    break
+                pending.append(executor.submit(_run_dd_item, *item))
+
+            if not pending or (cancel is not None and cancel.is_set()):
+                break
+
+            # Wake up regularly to check cancel while waiting for a slow work item.
+            while not pending[0].done():
+                concurrent.futures.wait([pending[0]], timeout=None if cancel is None else 0.1)
+                if cancel is not None and cancel.is_set():
+                    return
+
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_guided_campaign(pathset, PRNG_seed=0, max_vectors=1000, num_candidates=32, window=20, min_gain=1,
+                        output_pins=None, max_steps=None):
+    """
+    Determines the delay-defining paths of output pins for vectors chosen to cover the nodes not covered yet, and adds
+    the results to pathset.db_results, until the coverage saturates.
+
+    Each step is a small greedy search: the results of num_candidates random candidate vectors are determined for
+    the whole batch with Pathset.dd_results_batch, i.e. with dd_paths_iterative, and the candidate which covers the
+    most nodes not in db_covered_bits is applied and its results are added to db_results. The results of the other
+    candidates are not added, but stay in db_dd_cache, so cone values that recur in later candidates are not analyzed
+    again. Each step thus analyzes up to num_candidates vectors to apply one.
+
+    The campaign stops when the nodes newly covered by the last window steps are less than min_gain, when all input
+    vectors have been applied, or after max_vectors vectors or max_steps steps. A step applies no vector if all
+    candidates were applied before, so max_steps bounds the campaign even if min_gain is not positive.
+
+    pathset: Pathset of the circuit.
+    PRNG_seed: Seed of the candidate vectors; a campaign is reproducible for the same seed.
+    max_vectors: Maximum number of vectors to apply.
+    num_candidates: Number of candidate vectors per step.
+    window: Number of last steps over which the coverage gain is measured.
+    min_gain: Minimum number of nodes that the last window steps must newly cover for the campaign to go on.
+    output_pins: list of output pins to analyze; by default, all output pins in natural order.
+    max_steps: Maximum number of steps; by default, 2 * max_vectors.
+
+    Returns the list of input strings of the vectors applied, in order.
+    """
+
+    import numpy
+
+    if output_pins is None:
+        output_pins = pathset.netlist.natural_sorted(pathset.db_output_pins)
+    if max_steps is None:
+        max_steps = 2 * max_vectors
+
+    prng = random.Random(PRNG_seed)
+    input_pin_list_sorted = pathset.netlist.natural_sorted(pathset.db_input_pins)
+    num_pins = len(pathset.netlist.pins)
+
+    def num_bits(bitsets):
+        return numpy.unpackbits(bitsets, axis=-1, count=num_pins, bitorder='little').sum(axis=-1)
+
+    input_strings = []
+    applied = set()
+    gains = collections.deque(maxlen=window)
+    for _ in range(max_steps):
+        if len(input_strings) >= max_vectors or len(applied) == 2 ** len(input_pin_list_sorted):
+            break
+
+        candidates = [''.join(str(prng.getrandbits(1)) for _ in input_pin_list_sorted)
+                      for _ in range(num_candidates)]
+
+        # Nodes covered by each candidate (candidates x bytes of bitsets), over all output pins.
+        covered = numpy.bitwise_or.reduce(pathset.dd_results_batch(output_pins, candidates)[2], axis=0)
+        uncovered_bits = ~pathset.db_covered_bits & ((1 << num_pins) - 1)
+        uncovered = numpy.frombuffer(uncovered_bits.to_bytes(covered.shape[1], 'little'), dtype=numpy.uint8)
+        scores = num_bits(covered & uncovered)
+
+        best = max((candidate for candidate in range(num_candidates) if candidates[candidate] not in applied),
+                   key=lambda candidate: scores[candidate], default=None)
+
+        if best is not None:
+            num_covered = pathset.db_num_covered
+            pathset.update_db_node_values({pin: int(value)
+                                           for pin, value in zip(input_pin_list_sorted, candidates[best])})
+            # The results of the candidate are taken from db_dd_cache.
+            pathset.dd_paths_outputs(output_pins)
+
+            input_strings += [candidates[best]]
+            applied.add(candidates[best])
+            gains.append(pathset.db_num_covered - num_covered)
+
+            print(len(input_strings), 'vectors,', pathset.db_num_covered, '/', num_pins, 'nodes covered')
+        else:
+            # All candidates were applied before, e.g. as the input space is small.
+            gains.append(0)
+
+        if len(gains) == window and sum(gains) < min_gain:
+            break
+
+    return input_strings
@@ -0,0 +1,139 @@
+"""
+Index of the transitive fan-in and fan-out cones of a compiled netlist
+(db.netlist.Netlist), as integer bitsets.
+
+For each pin, the index holds the bitset of the input pins in its transitive
+fan-in, in which bit k is set for input pin ID k, and the bitset of the output
+pins in its transitive fan-out, in which bit k is set for the output pin
+netlist.outputs[k]. Both include the pin itself if it is an input or output
+pin. Queries such as "which outputs does a flipped input affect" or "do two
+pins share an input" are then a few integer operations.
+
+The index is made in two passes over the netlist, forward for the fan-in and
+backward for the fan-out. It takes a bit per pin and input pin, so it is only
+stored in the 'cones' table of the netlist, to be saved with the netlist cache
+(see db.netlist_cache), if asked to.
+"""
+
+
+class ConeIndex:
+    """
+    Bitsets of the transitive fan-in input pins and fan-out output pins of
+    each pin of a netlist.
+
+    netlist is db.netlist.Netlist object.
+    fanin_inputs is list of bitsets of input pin IDs, indexed by pin ID.
+    fanout_outputs is list of bitsets of indices into netlist.outputs,
+    indexed by pin ID.
+    """
+
+    def __init__(self, netlist, fanin_inputs, fanout_outputs):
+        self.netlist = netlist
+        self.fanin_inputs = fanin_inputs
+        self.fanout_outputs = fanout_outputs
+
+    def input_bits(self, pins):
+        """
+        Return bitset of the input pins in the transitive fan-in of pin IDs
+        in pins.
+        """
+
+        bits = 0
+        for pin in pins:
+            bits |= self.fanin_inputs[pin]
+
+        return bits
+
+    def output_bits(self, pins):
+        """
+        Return bitset of the output pins in the transitive fan-out of pin IDs
+        in pins.
+        """
+
+        bits = 0
+        for pin in pins:
+            bits |= self.fanout_outputs[pin]
+
+        return bits
+
+    def input_pins(self, bits):
+        """ Return list of the IDs of the input pins of bitset bits. """
+        return [pin for pin in range(bits.bit_length()) if (bits >> pin) & 1]
+
+    def output_pins(self, bits):
+        """ Return list of the IDs of the output pins of bitset bits. """
+        outputs = self.netlist.outputs
+        return [outputs[k] for k in range(bits.bit_length())
+                if (bits >> k) & 1]
+
+    def affected_outputs(self, pins):
+        """
+        Return list of the IDs of the output pins whose value may change if
+        the pin IDs in pins change, in order of netlist.outputs.
+        """
+
+        return self.output_pins(self.output_bits(pins))
+
+    def shares_inputs(self, pin, other_pin):
+        """
+        Return True if the fan-in cones of pin IDs pin and other_pin have an
+        input pin in common.
+        """
+
+        return bool(self.fanin_inputs[pin] & self.fanin_inputs[other_pin])
+
+    def in_fanin(self, input_pin, pin):
+        """ Return True if input pin ID input_pin is in the fan-in of pin. """
+        return bool((self.fanin_inputs[pin] >> input_pin) & 1)
+
+
+def make_cone_index(netlist):
+    """
+    Return the ConeIndex of netlist, made in one forward and one backward
+    pass over its pins in topological order.
+    """
+
+    num_pins = len(netlist)
+    fanin = netlist.fanin
+    fanin_start = netlist.fanin_start
+    fanout = netlist.fanout
+    fanout_start = netlist.fanout_start
+
+    fanin_inputs = [0] * num_pins
+    for pin in range(netlist.num_inputs):
+        fanin_inputs[pin] = 1 << pin
+    for pin in range(netlist.num_inputs, num_pins):
+        bits = 0
+        for k in fanin[fanin_start[pin]:fanin_start[pin+1]]:
+            bits |= fanin_inputs[k]
+        fanin_inputs[pin] = bits
+
+    fanout_outputs = [0] * num_pins
+    for k, pin in enumerate(netlist.outputs):
+        fanout_outputs[pin] |= 1 << k
+    for pin in reversed(range(num_pins)):
+        bits = fanout_outputs[pin]
+        for k in fanout[fanout_start[pin]:fanout_start[pin+1]]:
+            bits |= fanout_outputs[k]
+        fanout_outputs[pin] = bits
+
+    return ConeIndex(netlist, fanin_inputs, fanout_outputs)
+
+
+def cone_index(netlist, cache=False):
+    """
+    Return the ConeIndex of netlist, reusing that stored in
+    netlist.tables['cones'], if any. If cache is True, a new index is stored
+    there, from where it is written to the netlist cache the next time the
+    netlist is saved.
+    """
+
+    if 'cones' in netlist.tables:
+        fanin_inputs, fanout_outputs = netlist.tables['cones']
+        return ConeIndex(netlist, fanin_inputs, fanout_outputs)
+
+    index = make_cone_index(netlist)
+    if cache:
+        netlist.tables['cones'] = (index.fanin_inputs, index.fanout_outputs)
+
+    return index
@@ -0,0 +1,79 @@
+"""
+Depth histograms of a compiled netlist (db.netlist.Netlist), vectorized with
+NumPy.
+
+The depth histogram of a pin holds, for each input pin and each depth, the
+number of paths from the input pin to the pin of that depth, where the depth
+of a path is its number of gates, or optionally the sum of the delays of its
+gates (e.g. GateDB.delays, the path lengths of Pathset.path_length_T, as
+counted by VerilogSQL.symmpathcountSQL). The histograms of all pins form a
+3-D array (pins x input pins x depth bins), indexed by pin ID, so presence of
+depths is the same as in Pathset.db_node_depths, but paths are counted.
+
+The histograms are made in one topological pass: the histogram of a gate
+output is the sum of the histograms of its input pins, shifted by the depth of
+the gate. Gates are evaluated in groups of the same logic level, gate depth,
+and number of input pins, so each group is a single NumPy operation.
+"""
+
+from db.netlist import GATE_NAMES
+
+
+def depth_histograms(netlist, delays=None, max_depth=None, dtype=None):
+    """
+    Return 3-D NumPy array (pins x input pins x depth bins) of path counts,
+    indexed by pin ID on both pin axes (input pins are the first pin IDs of
+    the netlist). Entry [pin, inpin, depth] is the number of paths from inpin
+    to pin of depth depth; each input pin has a single path of depth 0 to
+    itself.
+
+    delays is dict of gate delays keyed by gate name, used as the depth of
+    each gate; by default, each gate has depth 1.
+    max_depth is the largest depth binned; deeper paths are not counted. By
+    default, the depth of the deepest path of the netlist.
+    dtype is NumPy dtype of the counts; defaults to int64. The number of paths
+    may grow exponentially with the depth of the circuit, so use float64 for
+    circuits where counts could exceed 2**63.
+    """
+
+    import numpy
+
+    if dtype is None:
+        dtype = numpy.int64
+
+    num_inputs = netlist.num_inputs
+    if delays is None:
+        steps = [1] * len(netlist)
+    else:
+        steps = [delays[GATE_NAMES[netlist.gate_types[pin]]]
+                 if pin >= num_inputs else 0 for pin in range(len(netlist))]
+
+    groups = {}
+    deepest = [0] * len(netlist)
+    for pin in range(num_inputs, len(netlist)):
+        fanin = netlist.fanin_of(pin)
+        deepest[pin] = steps[pin] + max(deepest[k] for k in fanin)
+        key = (netlist.levels[pin], steps[pin], len(fanin))
+        groups.setdefault(key, ([], []))
+        groups[key][0].append(pin)
+        groups[key][1].append(fanin)
+
+    if max_depth is None:
+        max_depth = max(deepest, default=0)
+    if max_depth < 0:
+        raise ValueError("depth_histograms received max_depth " +
+                         str(max_depth) + ".")
+
+    num_bins = max_depth + 1
+    counts = numpy.zeros((len(netlist), num_inputs, num_bins), dtype=dtype)
+    counts[numpy.arange(num_inputs), numpy.arange(num_inputs), 0] = 1
+
+    for (_, step, _), (pins, fanins) in sorted(groups.items()):
+        if step >= num_bins:
+            continue
+        pins = numpy.array(pins, dtype=numpy.intp)
+        # gates x input pins x depth bins
+        summed = counts[numpy.array(fanins, dtype=numpy.intp)].sum(axis=1)
+        counts[pins, :, step:] = summed[:, :, :num_bins - step]
+
+    return counts
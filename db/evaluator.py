@@ -0,0 +1,121 @@
+"""
+Straight-line evaluators of compiled netlists (db.netlist.Netlist).
+
+A netlist is compiled into a generated Python function with one assignment
+per gate, in topological order, e.g. for c17:
+
+    def evaluate(inputs, mask):
+        v0, v1, v2, v3, v4 = inputs
+        v5 = (v0 & v2) ^ mask
+        ...
+        return [v0, v1, v2, v3, v4, v5, ...]
+
+The function has no dispatch on gate types and no dict lookups, so it is much
+faster than evaluating the gates one by one. Values are bitmaps as in
+db.simulate, i.e. ints or NumPy uint64 arrays, and gate outputs are the same
+as those of db.simulate.evaluate_gate.
+
+Compiled code is cached per circuit hash (netlist.key) in this process, and in
+the 'evaluator' table of the netlist, so that it is saved with the netlist
+cache (see db.netlist_cache).
+"""
+
+import importlib.util
+import marshal
+from db.netlist import GateType
+
+# Compiled evaluators of this process, keyed by netlist key.
+_evaluators = {}
+
+
+def gate_expression(gate, inputs):
+    """
+    Return Python expression of a gate output.
+
+    gate is GateType of the gate.
+    inputs is list of variable names of the gate input pins.
+    """
+
+    if gate in (GateType.AND, GateType.BUF):
+        return ' & '.join(inputs)
+    elif gate == GateType.NAND:
+        return '(' + ' & '.join(inputs) + ') ^ mask'
+    elif gate == GateType.OR:
+        return ' | '.join(inputs)
+    elif gate == GateType.NOR or gate == GateType.NOT:
+        return '(' + ' | '.join(inputs) + ') ^ mask'
+    elif gate == GateType.XOR:
+        if len(inputs) == 2:
+            return inputs[0] + ' ^ ' + inputs[1]
+        return ('(' + ' | '.join(inputs) + ') & ((' + ' & '.join(inputs) +
+                ') ^ mask)')
+    else:
+        raise ValueError("gate_expression received unknown gate type " +
+                         str(gate) + ".")
+
+
+def evaluator_source(netlist):
+    """
+    Return source code of the evaluator function of netlist.
+
+    The function evaluate(inputs, mask) takes a sequence of bitmaps of the
+    input pins, indexed by pin ID, and the mask bitmap with the bits of all
+    vectors set (1 for single values), and returns list of bitmaps of all
+    pins, indexed by pin ID.
+    """
+
+    gate_types = netlist.gate_types
+    fanin = netlist.fanin
+    fanin_start = netlist.fanin_start
+
+    lines = ['def evaluate(inputs, mask):']
+    if netlist.num_inputs:
+        lines += ['    ' + ''.join('v' + str(pin) + ', '
+                                   for pin in range(netlist.num_inputs)) +
+                  '= inputs']
+
+    for pin in range(netlist.num_inputs, len(netlist)):
+        inputs = ['v' + str(k)
+                  for k in fanin[fanin_start[pin]:fanin_start[pin+1]]]
+        lines += ['    v' + str(pin) + ' = ' +
+                  gate_expression(gate_types[pin], inputs)]
+
+    lines += ['    return [' + ', '.join('v' + str(pin)
+                                       for pin in range(len(netlist))) + ']']
+
+    return '\n'.join(lines) + '\n'
+
+
+def compile_evaluator(netlist):
+    """
+    Return the evaluator function of netlist (see evaluator_source), reusing
+    compiled code cached in this process or in netlist.tables, if any.
+
+    New compiled code is stored in netlist.tables['evaluator'], from where it
+    is written to the netlist cache the next time the netlist is saved.
+    """
+
+    if netlist.key is not None and netlist.key in _evaluators:
+        return _evaluators[netlist.key]
+
+    code = None
+    if 'evaluator' in netlist.tables:
+        magic, data = netlist.tables['evaluator']
+        # Compiled code may only be loaded by the Python version that made it.
+        if magic == importlib.util.MAGIC_NUMBER:
+            code = marshal.loads(data)
+
+    if code is None:
+        code = compile(evaluator_source(netlist),
+                       '<evaluator ' + str(netlist.circuit) + '>', 'exec')
+        netlist.tables['evaluator'] = (importlib.util.MAGIC_NUMBER,
+                                       marshal.dumps(code))
+
+    namespace = {}
+    exec(code, namespace)
+    evaluate = namespace['evaluate']
+
+    if netlist.key is not None:
+        _evaluators[netlist.key] = evaluate
+
+    return evaluate
@@ -1,9 +1,15 @@
 """
 Class definition for gate database. It contains the list of gates and
 relational databases, and defines gate names and their path delays.
+
+A GateDB may be backed by a compiled db.netlist.Netlist, in which case its db
+is a GateMap that makes GateElement objects from the netlist on access instead
+of storing one object per gate.
 """
 
 import re
+from collections.abc import MutableMapping
+from db.netlist import natural_key
 
 
 class GateDB:
@@ -12,9 +18,13 @@ class GateDB:
     delays = {'nand': 1, 'nor': 1, 'xor': 1, 'not': 1,
               'and': 2, 'or': 2, 'buf': 2}
 
-    def __init__(self):
+    def __init__(self, netlist=None):
         # Key by output pin, value is GateElement object
-        self.db = {}
+        self.netlist = netlist
+        if netlist is None:
+            self.db = {}
+        else:
+            self.db = GateMap(netlist)
 
     def __repr__(self):
 
@@ -23,10 +33,11 @@ class GateDB:
         except TypeError:
             print("GateDB __repr__ finds db is not dict type.")
 
-        # Sort output pins (keys) by digits.
-        keylistsorted = sorted(keylist, key=lambda akey:
-                               ''.join(letter for letter in akey
-                                       if letter.isdigit()))
+        # Sort output pins (keys) in natural order.
+        if self.netlist is not None:
+            keylistsorted = self.netlist.natural_sorted(keylist)
+        else:
+            keylistsorted = sorted(keylist, key=natural_key)
 
         print_repr = ''
 
@@ -61,8 +72,7 @@ class GateDB:
                                          )
 
         def sorted_input_pins(self):
-            return sorted(list(self.input_pins), key=lambda number:
-                          int(''.join(k for k in number if k.isdigit())))
+            return sorted(list(self.input_pins), key=natural_key)
 
     def path_delay(self, gate_list):
         """
@@ -203,3 +213,68 @@ class GateDB:
         else:
             raise ValueError("GateDB.delay_def_value received gate type " +
                              "that resulted in no return value: " + gate + ".")
+
+
+class GateMap(MutableMapping):
+    """
+    Mapping of output pins to GateDB.GateElement objects, backed by a
+    db.netlist.Netlist. Elements of the netlist gates are made on access.
+    Elements that are set or deleted are kept as changes over the netlist,
+    which itself is never modified.
+    """
+
+    def __init__(self, netlist):
+        self.netlist = netlist
+        self.added = {}
+        self.removed = set()
+
+    def __getitem__(self, output_pin):
+        if output_pin in self.added:
+            return self.added[output_pin]
+        if output_pin in self.removed:
+            raise KeyError(output_pin)
+
+        pin = self.netlist.pin_id[output_pin]
+        if pin < self.netlist.num_inputs:
+            raise KeyError(output_pin)
+
+        return GateDB.GateElement(self.netlist.gate_name(pin),
+                                  output_pin,
+                                  [self.netlist.pins[k]
+                                   for k in self.netlist.fanin_of(pin)])
+
+    def __setitem__(self, output_pin, element):
+        self.added[output_pin] = element
+        self.removed.discard(output_pin)
+
+    def __delitem__(self, output_pin):
+        if output_pin in self.added:
+            del self.added[output_pin]
+            if self.in_netlist(output_pin):
+                self.removed.add(output_pin)
+        elif self.in_netlist(output_pin) and output_pin not in self.removed:
+            self.removed.add(output_pin)
+        else:
+            raise KeyError(output_pin)
+
+    def __iter__(self):
+        for output_pin in self.added:
+            yield output_pin
+        pins = self.netlist.pins
+        for pin in range(self.netlist.num_inputs, len(pins)):
+            if pins[pin] not in self.added and pins[pin] not in self.removed:
+                yield pins[pin]
+
+    def __len__(self):
+        return (self.netlist.num_gates() - len(self.removed) +
+                sum(1 for output_pin in self.added
+                    if not self.in_netlist(output_pin)))
+
+    def __contains__(self, output_pin):
+        if output_pin in self.added:
+            return True
+        return self.in_netlist(output_pin) and output_pin not in self.removed
+
+    def in_netlist(self, output_pin):
+        pin = self.netlist.pin_id.get(output_pin)
+        return pin is not None and pin >= self.netlist.num_inputs
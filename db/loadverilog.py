@@ -2,9 +2,12 @@
 Load verilog code and return its contents as a verilog db class, defined below.
 """
 
-import mmap
 import re
+from db.evaluator import compile_evaluator
 from db.gate_db import GateDB
+from db.netlist import natural_key
+from db.netlist_cache import load_cached_netlist
+from db.simulate import evaluate_gate
 from sqlalchemy import (
     Table,
     Column,
@@ -22,31 +25,71 @@ class VerilogDB:
     Class that stores Verilog database of pins, gates, and pin values.
     """
 
-    def __init__(self):
+    def __init__(self, netlist=None):
         self.input_pins = set()
         self.input_pin_values = {}
         self.output_pins = set()
         self.output_pin_values = {}
         self.node_pins = set()
         self.node_pin_values = {}
-        self.gatedb = GateDB()
+        self.netlist = netlist
+        self.gatedb = GateDB(netlist)
+
+    def pins_sorted(self, pins):
+        """
+        Return pins in natural order, using the precomputed order of the
+        netlist if the database is backed by one.
+        """
+
+        if self.netlist is not None:
+            return self.netlist.natural_sorted(pins)
+        return sorted(pins, key=natural_key)
 
     def input_pins_sorted(self):
-        return sorted(self.input_pins, key=lambda number:
-                      int(''.join(k for k in number if k.isdigit())))
+        return self.pins_sorted(self.input_pins)
 
     def output_pins_sorted(self):
-        return sorted(self.output_pins, key=lambda number:
-                      int(''.join(k for k in number if k.isdigit())))
+        return self.pins_sorted(self.output_pins)
 
     def node_pins_sorted(self):
-        return sorted(self.node_pins, key=lambda number:
-                      int(''.join(k for k in number if k.isdigit())))
+        return self.pins_sorted(self.node_pins)
+
+    def evaluate_pin_values(self):
+        """
+        Calculate node_pin_values and output_pin_values from
+        input_pin_values with the generated straight-line evaluator of the
+        netlist (see db.evaluator). The evaluator is compiled once per
+        circuit.
+
+        Requires the database to be backed by a netlist, e.g. loaded by
+        load_verilog, and input_pin_values to be complete.
+        """
+
+        if self.netlist is None:
+            raise ValueError("VerilogDB.evaluate_pin_values requires a " +
+                             "netlist.")
+
+        netlist = self.netlist
+        try:
+            input_values = [self.input_pin_values[pin]
+                            for pin in netlist.pins[:netlist.num_inputs]]
+        except KeyError as error:
+            raise ValueError("VerilogDB.evaluate_pin_values: input pin " +
+                             str(error) + " has no value.")
+
+        values = dict(zip(netlist.pins,
+                          compile_evaluator(netlist)(input_values, 1)))
+
+        for pin in self.node_pins:
+            self.node_pin_values[pin] = values[pin]
+        for pin in self.output_pins:
+            self.output_pin_values[pin] = values[pin]
 
 
 def load_verilog(circuit):
     """
-    Load verilog file and return as VerilogDB object.
+    Load verilog file and return as VerilogDB object. The verilog file is
+    compiled once and then read from the netlist cache, see db.netlist_cache.
 
     circuit is name of circuit to load
     Returns VerilogDB object
@@ -54,75 +97,14 @@ def load_verilog(circuit):
 
     filename = "./verilog/" + circuit + ".v"
 
-    return_db = VerilogDB()
-
-    with open(filename, "r") as file_data:
-        file_verilog = mmap.mmap(file_data.fileno(), 0,
-                                 access=mmap.ACCESS_READ)
-
-    # Read input pins
-    while True:
-        verilog_line = file_verilog.readline()
-        verilog_line = verilog_line.decode('ascii')
-        if verilog_line[0:5] == 'input':
-            break
-    verilog_line = verilog_line[verilog_line.find('N'):verilog_line.find(';')]
-    return_db.input_pins = set(verilog_line.split(','))
-
-    # Read output pins
-    while True:
-        verilog_line = file_verilog.readline()
-        verilog_line = verilog_line.decode('ascii')
-        if verilog_line[0:6] == 'output':
-            break
-
-    verilog_line = verilog_line[verilog_line.find('N'):verilog_line.find(';')]
-    return_db.output_pins = set(verilog_line.split(','))
-
-    # Read node pins
-    while True:
-        verilog_line = file_verilog.readline()
-        verilog_line = verilog_line.decode('ascii')
-        if verilog_line[0:4] == 'wire':
-            break
-
-    verilog_line = verilog_line[5:]
-    verilog_line_2 = ''
-    while True:
-        if 'N' not in verilog_line:
-            break
-
-        if ';' in verilog_line:
-            verilog_line_2 += verilog_line[verilog_line.find('N'):
-                                           verilog_line.find(';')]
-        else:
-            verilog_line_2 += verilog_line[verilog_line.find('N'):
-                                           verilog_line.rfind(',')+1]
-
-        verilog_line = file_verilog.readline()
-        verilog_line = verilog_line.decode('ascii')
-
-    return_db.node_pins = set(verilog_line_2.split(','))
-
-    # Read gate
-    while True:
-        verilog_line = file_verilog.readline()
-        verilog_line = verilog_line.decode('ascii')
-        if verilog_line[0:verilog_line.find(" ")] in GateDB.names:
-            gate = verilog_line[0:verilog_line.find(" ")]
-            verilog_line = verilog_line[verilog_line.find('(')+1:
-                                        verilog_line.find(')')]
-            verilog_line = verilog_line.split(', ')
-            outpin = verilog_line[0]
-            inpin = verilog_line[1:]
+    netlist = load_cached_netlist(filename, circuit)
 
-            return_db.gatedb.db[outpin] = GateDB.GateElement(
-                                         gate, outpin, inpin)
+    # Gates are not copied; return_db.gatedb is backed by the netlist.
+    return_db = VerilogDB(netlist)
 
-        elif verilog_line == "":
-            break
-
-    file_verilog.close()
+    return_db.input_pins = set(netlist.input_pins)
+    return_db.output_pins = set(netlist.output_pins)
+    return_db.node_pins = set(netlist.node_pins)
 
     return return_db
 
@@ -187,6 +169,8 @@ class VerilogSQL:
         self.circuit = None
         self.conn = None
         self.VerilogDB = VerilogDB()
+        self.netlist = None
+        self.levelization = None
 
     def loadfile(self):
         self.engineVerilog = create_engine(
@@ -482,13 +466,90 @@ class VerilogSQL:
 
         return returngatedb
 
+    def levelize(self):
+        """
+        Load the compiled netlist of the circuit once and levelize it, so that
+        pin values can be evaluated in memory for every vector.
+
+        The netlist is read from the verilog code of the circuit through the
+        netlist cache, as load_verilog does, rather than from the gates table
+        of the SQL database, which holds at most 10 input pins per gate.
+
+        self.netlist is the compiled netlist (see db.netlist), and
+        self.levelization is a list of lists of the pin IDs of the gates at
+        each logic level, starting with level 1, read from the levels and
+        CSR fan-in of the netlist.
+        """
+
+        netlist = load_cached_netlist("./verilog/" + self.circuit + ".v",
+                                      self.circuit)
+
+        levelization = [[] for _ in range(max(netlist.levels, default=0))]
+        for pin in range(netlist.num_inputs, len(netlist.pins)):
+            levelization[netlist.levels[pin] - 1].append(pin)
+
+        self.netlist = netlist
+        self.levelization = levelization
+
+    def update_pin_values_levelized(self):
+        """
+        Update pin values as update_pin_values() does, but evaluate the
+        gates in memory, level by level, using the levelization made by
+        self.levelize(). The levelization is made once, on first use, and is
+        reused for every subsequent vector, so no SQL queries are issued per
+        vector and gates are not limited to 10 input pins. Gates are
+        evaluated from the fan-in of the netlist by db.simulate.evaluate_gate.
+
+        Requires the pin lists to have been loaded by self.loadinputpins(),
+        self.loadnodepins(), and self.loadoutputpins(), and
+        self.VerilogDB.input_pin_values to be complete.
+        """
+
+        if any([pin for pin in self.VerilogDB.input_pins
+                if pin not in self.VerilogDB.input_pin_values.keys()]):
+            raise ValueError("Error in update_pin_values_levelized: not " +
+                             "all input pins have values")
+
+        if self.levelization is None:
+            self.levelize()
+
+        netlist = self.netlist
+        pins = netlist.pins
+        gate_types = netlist.gate_types
+        fanin = netlist.fanin
+        fanin_start = netlist.fanin_start
+
+        values = [None] * len(pins)
+        for pin in range(netlist.num_inputs):
+            try:
+                values[pin] = int(self.VerilogDB.input_pin_values[pins[pin]])
+            except KeyError as error:
+                raise ValueError("Error in update_pin_values_levelized: " +
+                                 "input pin " + str(error) +
+                                 " of the netlist has no value")
+
+        for level in self.levelization:
+            for pin in level:
+                values[pin] = evaluate_gate(
+                    gate_types[pin],
+                    [values[k] for k in
+                     fanin[fanin_start[pin]:fanin_start[pin+1]]],
+                    1)
+
+        values = dict(zip(pins, values))
+        for pin in self.VerilogDB.node_pins:
+            self.VerilogDB.node_pin_values[pin] = values[pin]
+        for pin in self.VerilogDB.output_pins:
+            self.VerilogDB.output_pin_values[pin] = values[pin]
+
     def update_pin_values(self):
         """
         Starting with circuit input pins, update pin values. Perform
         iteratively by getting all values that can be calculated from input
         pins, then calculate new values based on newly calculated pins, etc.
         The gives the advantage of not having to load full gate database
-        to calculate pin values.
+        to calculate pin values. When evaluating many vectors, use
+        update_pin_values_levelized() instead, which loads the gates once.
 
         Requires self.gatedb to have been loaded from the SQL database using
         self.loadfile() and all gate list and pin lists to have been loaded
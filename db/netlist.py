@@ -0,0 +1,545 @@
+"""
+Compiled netlist of a Verilog circuit. The Verilog file is read once and its
+pins and gates are stored in topological order, so that consumers such as
+pathsets.Pathset and db.gate_db.GateDB can evaluate and traverse the circuit
+without re-reading or re-splitting the Verilog text.
+
+Each pin is given a dense integer ID. Input pins take the first IDs, followed
+by gate output pins in topological order, so iterating over the gate IDs in
+increasing order visits every gate after the gates driving its input pins.
+Gate types are stored as GateType values and fan-in and fan-out as compressed
+sparse row (CSR) arrays: the fan-in pins of pin k are
+fanin[fanin_start[k]:fanin_start[k+1]], and likewise for fan-out.
+"""
+
+import enum
+import heapq
+import re
+from array import array
+from db.tokenizer import (
+    declared_pins,
+    open_verilog,
+    split_ports,
+    statements_verilog,
+    tokenize_verilog,
+)
+
+# Version of the parser and of the compiled netlist layout. Bump whenever
+# either changes so that cached netlists are rebuilt.
+PARSER_VERSION = 5
+
+
+class GateType(enum.IntEnum):
+    """
+    Gate types of the pins of a netlist. Input pins have type INPUT.
+    """
+
+    INPUT = 0
+    AND = 1
+    NAND = 2
+    OR = 3
+    NOR = 4
+    NOT = 5
+    XOR = 6
+    BUF = 7
+
+
+# Gate types keyed by gate names as used in the Verilog code, and vice versa.
+GATE_TYPES = {'and': GateType.AND, 'nand': GateType.NAND, 'or': GateType.OR,
+              'nor': GateType.NOR, 'not': GateType.NOT, 'xor': GateType.XOR,
+              'buf': GateType.BUF}
+GATE_NAMES = {gate_type: gate for gate, gate_type in GATE_TYPES.items()}
+
+
+def natural_key(pin):
+    """
+    Return natural sort key of a pin name, in which runs of digits compare as
+    integers, e.g. N2 sorts before N10.
+    """
+
+    key = re.split(r'(\d+)', pin)
+    key[1::2] = [int(digits) for digits in key[1::2]]
+    return key
+
+
+class Netlist:
+    """
+    Class that stores the compiled netlist of a circuit.
+
+    circuit: String name of circuit, e.g. c17.
+    input_pins: List of input pins, in order of declaration.
+    output_pins: List of output pins, in order of declaration.
+    node_pins: List of node pins (wires), in order of declaration.
+    pins: List of pin names, indexed by pin ID.
+    pin_id: Dict of pin IDs keyed by pin name.
+    num_inputs: Number of input pins, which have IDs 0 to num_inputs-1. The
+    remaining IDs are gate output pins, in topological order.
+    outputs: Array of IDs of output pins, in order of declaration.
+    gate_types: Bytearray of GateType values, indexed by pin ID.
+    fanin_start, fanin: CSR arrays of the input pin IDs of each gate.
+    fanout_start, fanout: CSR arrays of the IDs of gates driven by each pin.
+    levels: Array of logic levels, indexed by pin ID. Input pins are level 0
+    and a gate output pin is one more than the highest level of its inputs.
+    natural_order: Array of pin IDs in natural order of their names, see
+    natural_key. natural_rank is its inverse, indexed by pin ID.
+    tables: Dict of tables derived from the netlist, e.g. node depths, keyed by
+    name. These are stored along with the netlist by db.netlist_cache.
+    filename: String path of the verilog file the netlist was loaded from.
+    key: String hash of the verilog file contents and parser version, which
+    identifies the netlist in db.netlist_cache.
+    saved_tables: Set of the names of the tables written to the netlist cache
+    with the netlist, or None if the netlist was not written to the cache.
+    """
+
+    names = set(GATE_TYPES)
+
+    def __init__(self, circuit):
+        self.circuit = circuit
+        self.input_pins = []
+        self.output_pins = []
+        self.node_pins = []
+        self.pins = []
+        self.pin_id = {}
+        self.num_inputs = 0
+        self.outputs = array('l')
+        self.gate_types = bytearray()
+        self.fanin_start = array('l', [0])
+        self.fanin = array('l')
+        self.fanout_start = array('l', [0])
+        self.fanout = array('l')
+        self.levels = array('l')
+        self.natural_order = array('l')
+        self.natural_rank = array('l')
+        self.tables = {}
+        self.filename = None
+        self.key = None
+        self.saved_tables = None
+
+    def __repr__(self):
+        return "Netlist {}: {} inputs, {} outputs, {} nodes, {} gates".format(
+            self.circuit,
+            len(self.input_pins),
+            len(self.output_pins),
+            len(self.node_pins),
+            self.num_gates()
+        )
+
+    def __len__(self):
+        return len(self.pins)
+
+    def num_gates(self):
+        return len(self.pins) - self.num_inputs
+
+    def all_pins(self):
+        return set(self.input_pins) | set(self.output_pins) | \
+            set(self.node_pins)
+
+    def gate_name(self, pin):
+        """ Return the gate name (e.g. 'nand') of the gate driving pin ID. """
+        return GATE_NAMES[self.gate_types[pin]]
+
+    def fanin_of(self, pin):
+        """ Return array of IDs of the input pins of the gate of pin ID. """
+        return self.fanin[self.fanin_start[pin]:self.fanin_start[pin+1]]
+
+    def fanout_of(self, pin):
+        """ Return array of IDs of the gates driven by pin ID. """
+        return self.fanout[self.fanout_start[pin]:self.fanout_start[pin+1]]
+
+    def fanout_cone(self, pins):
+        """
+        Return set of IDs of the pins in the transitive fan-out of the pin IDs
+        in pins, including the pins themselves.
+        """
+
+        fanout = self.fanout
+        fanout_start = self.fanout_start
+        cone = set(pins)
+        frontier = list(cone)
+        while frontier:
+            pin = frontier.pop()
+            for k in fanout[fanout_start[pin]:fanout_start[pin+1]]:
+                if k not in cone:
+                    cone.add(k)
+                    frontier.append(k)
+
+        return cone
+
+    def gates(self):
+        """
+        Generate the gates in topological order as 3-tuples of (output pin,
+        gate name, tuple of input pins), using pin names.
+        """
+
+        pins = self.pins
+        fanin = self.fanin
+        fanin_start = self.fanin_start
+        for pin in range(self.num_inputs, len(pins)):
+            yield (pins[pin],
+                   GATE_NAMES[self.gate_types[pin]],
+                   tuple(pins[k] for k in
+                         fanin[fanin_start[pin]:fanin_start[pin+1]]))
+
+    def natural_sorted(self, pins):
+        """
+        Return list of pin names sorted in natural order, using the
+        precomputed natural_rank. Pins that are not in the netlist, e.g. those
+        added by circuit modifications, are sorted by natural_key instead.
+        """
+
+        pin_id = self.pin_id
+        if all(pin in pin_id for pin in pins):
+            rank = self.natural_rank
+            return sorted(pins, key=lambda pin: rank[pin_id[pin]])
+
+        return sorted(pins, key=natural_key)
+
+    def compile(self, gates):
+        """
+        Compile gates into the integer-indexed netlist. Gate output pins are
+        numbered in topological order, taking gates in order of declaration
+        whenever possible, so a Verilog file that is already ordered keeps its
+        order.
+
+        gates is dict of gates keyed by output pin, in order of declaration,
+        with values of 2-tuples (gate name, tuple of input pins).
+
+        Raises ValueError if a gate input pin or circuit output pin is driven
+        by neither a circuit input pin nor a gate, or if the circuit contains
+        a loop.
+        """
+
+        input_pins = set(self.input_pins)
+        for output_pin, (gate, gate_input_pins) in gates.items():
+            for pin in gate_input_pins:
+                if pin not in input_pins and pin not in gates:
+                    raise ValueError("Netlist.compile found input pin " +
+                                     pin + " of gate " + output_pin +
+                                     " that is not driven.")
+        for pin in self.output_pins:
+            if pin not in input_pins and pin not in gates:
+                raise ValueError("Netlist.compile found output pin " + pin +
+                                 " that is not driven.")
+
+        # Number of undetermined input pins of each gate, and the gates that
+        # each pin drives. Ready gates are released by order of declaration.
+        gate_pins = list(gates)
+        index = {pin: k for k, pin in enumerate(gate_pins)}
+        waiting = []
+        fanout = {}
+        for output_pin in gate_pins:
+            gate_input_pins = gates[output_pin][1]
+            waiting.append(sum(1 for pin in gate_input_pins
+                               if pin not in input_pins))
+            for pin in gate_input_pins:
+                fanout.setdefault(pin, []).append(index[output_pin])
+
+        order = []
+        ready = [k for k in range(len(gate_pins)) if waiting[k] == 0]
+        heapq.heapify(ready)
+        while ready:
+            k = heapq.heappop(ready)
+            order.append(k)
+            for j in fanout.get(gate_pins[k], []):
+                waiting[j] -= 1
+                if waiting[j] == 0:
+                    heapq.heappush(ready, j)
+
+        if len(order) != len(gate_pins):
+            raise ValueError("Netlist.compile found a loop in circuit " +
+                             str(self.circuit) + ".")
+
+        self.num_inputs = len(self.input_pins)
+        self.pins = self.input_pins + [gate_pins[k] for k in order]
+        self.pin_id = {pin: k for k, pin in enumerate(self.pins)}
+
+        # Keep a single copy of each pin name.
+        self.input_pins = self.pins[:self.num_inputs]
+        self.output_pins = [self.pins[self.pin_id[pin]]
+                            for pin in self.output_pins]
+        self.node_pins = [self.pins[self.pin_id[pin]]
+                          if pin in self.pin_id else pin
+                          for pin in self.node_pins]
+        self.outputs = array('l', [self.pin_id[pin]
+                                   for pin in self.output_pins])
+
+        self.gate_types = bytearray(self.num_inputs)
+        self.fanin = array('l')
+        self.fanin_start = array('l', [0] * (self.num_inputs + 1))
+        for pin in self.pins[self.num_inputs:]:
+            gate, gate_input_pins = gates[pin]
+            self.gate_types.append(GATE_TYPES[gate])
+            self.fanin.extend(self.pin_id[k] for k in gate_input_pins)
+            self.fanin_start.append(len(self.fanin))
+
+        self.make_fanout()
+        self.make_levels()
+        self.make_natural_order()
+
+    def make_fanout(self):
+        """ Make the fan-out CSR arrays from the fan-in CSR arrays. """
+
+        count = array('l', [0] * (len(self.pins) + 1))
+        for pin in self.fanin:
+            count[pin+1] += 1
+        for pin in range(len(self.pins)):
+            count[pin+1] += count[pin]
+
+        self.fanout_start = array('l', count)
+        self.fanout = array('l', [0] * len(self.fanin))
+        fanin = self.fanin
+        fanin_start = self.fanin_start
+        for pin in range(self.num_inputs, len(self.pins)):
+            for k in fanin[fanin_start[pin]:fanin_start[pin+1]]:
+                self.fanout[count[k]] = pin
+                count[k] += 1
+
+    def make_levels(self):
+        """ Make the logic level of each pin in one topological pass. """
+
+        levels = array('l', [0] * len(self.pins))
+        fanin = self.fanin
+        fanin_start = self.fanin_start
+        for pin in range(self.num_inputs, len(self.pins)):
+            levels[pin] = 1 + max(levels[k] for k in
+                                  fanin[fanin_start[pin]:fanin_start[pin+1]])
+        self.levels = levels
+
+    def make_natural_order(self):
+        """ Make the natural order permutation of the pins and its inverse. """
+
+        pins = self.pins
+        self.natural_order = array('l', sorted(
+            range(len(pins)), key=lambda pin: natural_key(pins[pin])))
+        self.natural_rank = array('l', [0] * len(self.pins))
+        for rank, pin in enumerate(self.natural_order):
+            self.natural_rank[pin] = rank
+
+    def pack(self):
+        """
+        Pack the netlist into a dict of lists and arrays, which can be written
+        compactly with pickle.
+        """
+
+        return {'version': PARSER_VERSION,
+                'circuit': self.circuit,
+                'key': self.key,
+                'pins': self.pins,
+                'num_inputs': self.num_inputs,
+                'output_pins': self.output_pins,
+                'node_pins': self.node_pins,
+                'gate_types': bytes(self.gate_types),
+                'fanin_start': self.fanin_start,
+                'fanin': self.fanin,
+                'fanout_start': self.fanout_start,
+                'fanout': self.fanout,
+                'levels': self.levels,
+                'natural_order': self.natural_order,
+                'natural_rank': self.natural_rank,
+                'tables': self.tables,
+                }
+
+    @classmethod
+    def unpack(cls, data):
+        """
+        Return a Netlist object from a dict made by pack().
+        """
+
+        if data['version'] != PARSER_VERSION:
+            raise ValueError("Netlist.unpack received netlist of parser " +
+                             "version " + str(data['version']) + ".")
+
+        netlist = cls(data['circuit'])
+        netlist.key = data['key']
+        netlist.pins = data['pins']
+        netlist.pin_id = {pin: k for k, pin in enumerate(netlist.pins)}
+        netlist.num_inputs = data['num_inputs']
+        netlist.input_pins = netlist.pins[:netlist.num_inputs]
+        netlist.output_pins = [netlist.pins[netlist.pin_id[pin]]
+                               for pin in data['output_pins']]
+        netlist.node_pins = [netlist.pins[netlist.pin_id[pin]]
+                             if pin in netlist.pin_id else pin
+                             for pin in data['node_pins']]
+        netlist.outputs = array('l', [netlist.pin_id[pin]
+                                      for pin in netlist.output_pins])
+        netlist.gate_types = bytearray(data['gate_types'])
+        netlist.fanin_start = data['fanin_start']
+        netlist.fanin = data['fanin']
+        netlist.fanout_start = data['fanout_start']
+        netlist.fanout = data['fanout']
+        netlist.levels = data['levels']
+        netlist.natural_order = data['natural_order']
+        netlist.natural_rank = data['natural_rank']
+        netlist.tables = data['tables']
+        netlist.saved_tables = set(netlist.tables)
+
+        return netlist
+
+
+# Gate names of continuous assignments by operator, without and with an
+# inversion of the whole expression.
+ASSIGN_GATES = {'&': ('and', 'nand'), '|': ('or', 'nor'), '^': ('xor', None)}
+
+# Single character tokens that cannot start an identifier.
+SYMBOLS = set('~&|^!()[]{}=,?:+-*/%<>\'"')
+
+
+def assigned_gates(tokens):
+    """
+    Return the gates of a continuous assignment statement, e.g. the tokens of
+    'assign N3 = N1 & N2' or 'assign N4 = ~(N1 | N2), N5 = N3'.
+
+    Supported expressions are an identifier (a buf gate), an inverted
+    identifier (a not gate), and identifiers joined by a single operator &,
+    |, or ^ (and, or, xor gates), optionally inverted as a whole, e.g.
+    ~(N1 & N2) (nand, nor gates). Identifiers may have bit-selects, e.g.
+    a[3].
+
+    tokens is list of tokens of the statement, after its keyword.
+    Returns list of 2-tuples (output pin, (gate name, tuple of input pins)).
+    Raises ValueError for other expressions, e.g. constants, inverted
+    operands such as ~N1 & N2, mixed operators, or ~(N1 ^ N2), which have no
+    gate type.
+    """
+
+    def unsupported():
+        return ValueError("load_netlist found unsupported assign " +
+                          "statement (only identifiers joined by one " +
+                          "of &, |, ^, optionally inverted as a whole, " +
+                          "are supported): assign " + ' '.join(tokens))
+
+    def identifier(position):
+        # Return pin name at tokens[position] and position after it.
+        if position >= len(tokens):
+            raise unsupported()
+        token = tokens[position]
+        if token in SYMBOLS or token[0].isdigit():
+            raise unsupported()
+        position += 1
+        if tokens[position:position+1] == ['[']:
+            if (tokens[position+2:position+3] != [']'] or
+                    not tokens[position+1].isdigit()):
+                raise unsupported()
+            token += '[' + tokens[position+1] + ']'
+            position += 3
+        return token, position
+
+    gates = []
+    position = 0
+    while position < len(tokens):
+        output_pin, position = identifier(position)
+        if tokens[position:position+1] != ['=']:
+            raise unsupported()
+        position += 1
+
+        inverted = tokens[position:position+1] == ['~']
+        position += inverted
+        parenthesised = tokens[position:position+1] == ['(']
+        position += parenthesised
+
+        input_pin, position = identifier(position)
+        input_pins = [input_pin]
+        operator = None
+        while tokens[position:position+1] in (['&'], ['|'], ['^']):
+            if operator not in (None, tokens[position]):
+                raise unsupported()
+            operator = tokens[position]
+            input_pin, position = identifier(position + 1)
+            input_pins.append(input_pin)
+
+        if parenthesised:
+            if tokens[position:position+1] != [')']:
+                raise unsupported()
+            position += 1
+        if position < len(tokens):
+            if tokens[position] != ',':
+                raise unsupported()
+            position += 1
+
+        if operator is None:
+            gate = 'not' if inverted else 'buf'
+        elif inverted and not parenthesised:
+            raise unsupported()
+        else:
+            gate = ASSIGN_GATES[operator][inverted]
+            if gate is None:
+                raise unsupported()
+        gates.append((output_pin, (gate, tuple(input_pins))))
+
+    return gates
+
+
+def load_netlist(filename, circuit=None):
+    """
+    Load verilog file in a single pass and return it as a compiled Netlist
+    object. The file is tokenized as a stream (see db.tokenizer), so
+    declarations may span several lines and may contain comments.
+
+    Gates are gate primitives (e.g. nand, with or without instance name) and
+    continuous assignments of the expressions supported by assigned_gates.
+    Other constructs, e.g. module instances, are ignored.
+
+    filename is path of the verilog file.
+    circuit is name of circuit; defaults to the module name in the file.
+    Returns Netlist object.
+    """
+
+    netlist = Netlist(circuit)
+    netlist.filename = filename
+    gates = {}
+
+    file_verilog = open_verilog(filename)
+
+    for statement in statements_verilog(tokenize_verilog(file_verilog)):
+        if not statement:
+            continue
+
+        keyword = statement[0]
+        driven = []
+        if keyword == 'module':
+            if netlist.circuit is None and len(statement) > 1:
+                netlist.circuit = statement[1]
+        elif keyword == 'input':
+            netlist.input_pins += declared_pins(statement[1:])
+        elif keyword == 'output':
+            netlist.output_pins += declared_pins(statement[1:])
+        elif keyword == 'wire':
+            netlist.node_pins += declared_pins(statement[1:])
+        elif keyword in Netlist.names:
+            # Instance name is optional, e.g. nand NAND2_1 (N10, N1, N3)
+            try:
+                start = statement.index('(')
+                end = len(statement) - statement[::-1].index(')') - 1
+            except ValueError:
+                raise ValueError("load_netlist found gate without pins: " +
+                                 ' '.join(statement))
+            pins = split_ports(statement[start+1:end])
+            if len(pins) < 2 or not all(pins):
+                raise ValueError("load_netlist found gate with missing " +
+                                 "pins: " + ' '.join(statement))
+            driven = [(pins[0], (keyword, tuple(pins[1:])))]
+        elif keyword == 'assign':
+            driven = assigned_gates(statement[1:])
+        elif keyword == 'endmodule':
+            break
+
+        for output_pin, gate in driven:
+            if output_pin in gates:
+                raise ValueError("load_netlist found pin " + output_pin +
+                                 " driven more than once: " +
+                                 ' '.join(statement))
+            gates[output_pin] = gate
+
+    if not isinstance(file_verilog, bytes):
+        file_verilog.close()
+
+    if not netlist.input_pins:
+        raise ValueError("load_netlist reached EOF of verilog file without " +
+                         "input: " + filename)
+    if not netlist.output_pins:
+        raise ValueError("load_netlist reached EOF of verilog file without " +
+                         "output: " + filename)
+
+    netlist.compile(gates)
+
+    return netlist
@@ -0,0 +1,147 @@
+"""
+On-disk cache of compiled netlists. A netlist is stored in binary (pickled)
+form under a key made from a hash of the verilog file contents and the parser
+version, so a cached netlist is rebuilt automatically whenever the verilog
+file or the parser changes.
+
+Cache files are written to a temporary file then renamed into place, so that
+several processes may load and write the same cache concurrently. A consumer
+which derives tables from the netlist (e.g. pathsets.Pathset) may load it with
+save=False and write it once with its tables, see save_netlist_tables.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from db.netlist import (
+    load_netlist,
+    Netlist,
+    PARSER_VERSION,
+)
+from db.tokenizer import open_verilog
+
+CACHE_DIR = '.netlist_cache'
+
+
+def netlist_key(filename):
+    """
+    Calculate the cache key of a verilog file.
+
+    filename is path of the verilog file.
+    Returns string of hexadecimal digits.
+    """
+
+    key = hashlib.sha1()
+    key.update(b'parser version ' + str(PARSER_VERSION).encode('ascii'))
+
+    file_verilog = open_verilog(filename)
+    key.update(file_verilog)
+    if not isinstance(file_verilog, bytes):
+        file_verilog.close()
+
+    return key.hexdigest()
+
+
+def cache_filename(filename, key, cache_dir=None):
+    """
+    Return path of the cache file for a verilog file with a given key.
+    cache_dir defaults to CACHE_DIR in the directory of the verilog file.
+    """
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(filename), CACHE_DIR)
+
+    circuit = os.path.splitext(os.path.basename(filename))[0]
+
+    return os.path.join(cache_dir, circuit + '.' + key + '.netlist')
+
+
+def save_netlist(netlist, cache_dir=None):
+    """
+    Write netlist, including its tables, to the cache. Cache files of older
+    versions of the same verilog file are removed.
+
+    netlist is Netlist object which was loaded by load_cached_netlist.
+    """
+
+    if netlist.filename is None or netlist.key is None:
+        raise ValueError("save_netlist received netlist without filename " +
+                         "or key.")
+
+    path = cache_filename(netlist.filename, netlist.key, cache_dir)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    file_handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(file_handle, "wb") as file_cache:
+            pickle.dump(netlist.pack(), file_cache, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    netlist.saved_tables = set(netlist.tables)
+
+    prefix = os.path.basename(path)
+    prefix = prefix[:prefix.find('.') + 1]
+    for name in os.listdir(directory):
+        if (name.startswith(prefix) and name.endswith('.netlist') and
+                name != os.path.basename(path)):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def save_netlist_tables(netlist, cache_dir=None):
+    """
+    Write netlist to the cache, as save_netlist, unless it was already written
+    with the same tables. Returns True if the cache was written.
+    """
+
+    if netlist.saved_tables == set(netlist.tables):
+        return False
+
+    save_netlist(netlist, cache_dir)
+
+    return True
+
+
+def load_cached_netlist(filename, circuit=None, cache_dir=None, save=True):
+    """
+    Load a compiled netlist from the cache, parsing the verilog file and
+    writing the cache only if there is no valid cache file.
+
+    filename is path of the verilog file.
+    circuit is name of circuit; defaults to the module name in the file.
+    cache_dir is directory of cache files; see cache_filename.
+    save is False to not write a parsed netlist to the cache, e.g. if the
+    caller writes it once its tables are made (see save_netlist_tables).
+    Returns Netlist object.
+    """
+
+    key = netlist_key(filename)
+    path = cache_filename(filename, key, cache_dir)
+
+    try:
+        with open(path, "rb") as file_cache:
+            netlist = Netlist.unpack(pickle.load(file_cache))
+    except (OSError, EOFError, ValueError, KeyError, pickle.PickleError):
+        netlist = None
+
+    if netlist is not None and netlist.key == key:
+        netlist.filename = filename
+        if circuit is not None:
+            netlist.circuit = circuit
+        return netlist
+
+    netlist = load_netlist(filename, circuit)
+    netlist.key = key
+    if save:
+        try:
+            save_netlist(netlist, cache_dir)
+        except OSError:
+            print('Could not write netlist cache for ' + filename)
+
+    return netlist
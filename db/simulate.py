@@ -0,0 +1,213 @@
+"""
+Bit-parallel logic simulation of a compiled netlist (db.netlist.Netlist).
+
+The values of a pin for a batch of N input vectors are packed into a bitmap,
+in which bit k is the value of the pin for vector k. A bitmap is either an
+arbitrary-width Python int, or a NumPy array of uint64 words (bit k is bit
+k % 64 of word k // 64). Each gate is then evaluated once per batch with
+bitwise operations, rather than once per vector.
+
+Gate outputs follow pathsets.Pathset.gate_output: a NOT gate with several
+inputs is a NOR, and an XOR gate is 1 when its inputs are not all equal (which
+for two inputs is the usual exclusive or).
+
+simulate_events re-evaluates single values incrementally, only through the
+fan-out cones of pins that toggle, for vectors that differ in a few inputs.
+"""
+
+import heapq
+from functools import reduce
+from operator import (
+    and_,
+    or_,
+)
+from db.netlist import GateType
+
+
+def bitmap_mask(num_vectors):
+    """ Return int bitmap with the bits of all num_vectors vectors set. """
+    return (1 << num_vectors) - 1
+
+
+def pack_vectors(vectors, num_pins):
+    """
+    Pack input vectors into bitmaps.
+
+    vectors is list of input vectors, each a sequence (e.g. a string such as
+    '10010' or a list of integers) of num_pins values 0 or 1.
+    Returns list of num_pins int bitmaps, one for each pin.
+    """
+
+    bitmaps = [0] * num_pins
+    for k, vector in enumerate(vectors):
+        bit = 1 << k
+        for pin in range(num_pins):
+            if int(vector[pin]):
+                bitmaps[pin] |= bit
+
+    return bitmaps
+
+
+def unpack_bitmap(bitmap, num_vectors):
+    """ Return list of the values (0 or 1) of an int bitmap per vector. """
+    return [(bitmap >> k) & 1 for k in range(num_vectors)]
+
+
+def bitmap_to_words(bitmap, num_vectors):
+    """ Return NumPy uint64 array of the words of an int bitmap. """
+
+    import numpy
+
+    num_words = (num_vectors + 63) // 64
+    return numpy.frombuffer(bitmap.to_bytes(8 * num_words, 'little'),
+                            dtype='<u8').astype(numpy.uint64)
+
+
+def words_to_bitmap(words):
+    """ Return int bitmap of a NumPy uint64 array of words. """
+
+    import numpy
+
+    return int.from_bytes(numpy.asarray(words, dtype='<u8').tobytes(),
+                          'little')
+
+
+def evaluate_gate(gate, inputs, mask):
+    """
+    Evaluate one gate with bitwise operations.
+
+    gate is GateType of the gate.
+    inputs is list of bitmaps (ints or NumPy arrays) of the gate input pins.
+    mask is bitmap with the bits of all vectors set; 1 for single values.
+
+    Returns bitmap of the gate output pin.
+    """
+
+    if gate == GateType.AND:
+        return reduce(and_, inputs)
+    elif gate == GateType.NAND:
+        return reduce(and_, inputs) ^ mask
+    elif gate == GateType.OR:
+        return reduce(or_, inputs)
+    elif gate == GateType.NOR or gate == GateType.NOT:
+        return reduce(or_, inputs) ^ mask
+    elif gate == GateType.XOR:
+        return reduce(or_, inputs) & (reduce(and_, inputs) ^ mask)
+    elif gate == GateType.BUF:
+        return reduce(and_, inputs)
+    else:
+        raise ValueError("evaluate_gate received unknown gate type " +
+                         str(gate) + ".")
+
+
+def simulate_bitmaps(netlist, input_bitmaps, mask):
+    """
+    Evaluate all gates of netlist for a batch of vectors.
+
+    netlist is db.netlist.Netlist object.
+    input_bitmaps is list of bitmaps of the input pins, indexed by pin ID.
+    mask is bitmap with the bits of all vectors set, e.g. from bitmap_mask,
+    used to complement bitmaps. Bitmaps and mask may be ints or NumPy arrays.
+
+    Returns list of bitmaps of all pins, indexed by pin ID.
+    """
+
+    if len(input_bitmaps) != netlist.num_inputs:
+        raise ValueError("simulate_bitmaps received " +
+                         str(len(input_bitmaps)) + " input bitmaps for " +
+                         str(netlist.num_inputs) + " input pins.")
+
+    values = list(input_bitmaps) + [None] * netlist.num_gates()
+    gate_types = netlist.gate_types
+    fanin = netlist.fanin
+    fanin_start = netlist.fanin_start
+
+    for pin in range(netlist.num_inputs, len(values)):
+        values[pin] = evaluate_gate(
+            gate_types[pin],
+            [values[k] for k in fanin[fanin_start[pin]:fanin_start[pin+1]]],
+            mask)
+
+    return values
+
+
+def simulate_words(netlist, input_words, num_vectors):
+    """
+    Evaluate all gates of netlist for a batch of vectors, with the bitmaps
+    held in NumPy uint64 arrays.
+
+    input_words is 2-D NumPy uint64 array (input pins x words), e.g. made with
+    bitmap_to_words.
+    num_vectors is number of vectors in the batch.
+
+    Returns 2-D NumPy uint64 array (pins x words), indexed by pin ID.
+    """
+
+    import numpy
+
+    num_words = (num_vectors + 63) // 64
+    mask = numpy.full(num_words, 0xFFFFFFFFFFFFFFFF, dtype=numpy.uint64)
+    if num_vectors % 64:
+        mask[-1] = numpy.uint64((1 << (num_vectors % 64)) - 1)
+
+    values = simulate_bitmaps(netlist,
+                              [numpy.asarray(words, dtype=numpy.uint64)
+                               for words in input_words],
+                              mask)
+
+    return numpy.vstack(values) if values else \
+        numpy.zeros((0, num_words), dtype=numpy.uint64)
+
+
+def simulate_events(netlist, values, changes):
+    """
+    Re-evaluate netlist after some pins change value, propagating the changes
+    (events) only through the fan-out cones of pins that actually toggle.
+    Gates are evaluated in order of pin ID, i.e. topological order, so each
+    affected gate is evaluated once, after all its changed input pins.
+
+    netlist is db.netlist.Netlist object.
+    values is list of current values (0 or 1) of all pins, indexed by pin ID,
+    e.g. from simulate_bitmaps with mask 1. It is updated in place.
+    changes is dict of new values keyed by pin ID, normally of input pins.
+
+    Returns list of IDs of the pins that toggled, in topological order.
+    """
+
+    gate_types = netlist.gate_types
+    fanin = netlist.fanin
+    fanin_start = netlist.fanin_start
+    fanout = netlist.fanout
+    fanout_start = netlist.fanout_start
+
+    toggled = []
+    scheduled = set()
+    events = []
+
+    for pin in sorted(changes):
+        if values[pin] != changes[pin]:
+            values[pin] = changes[pin]
+            toggled.append(pin)
+            for k in fanout[fanout_start[pin]:fanout_start[pin+1]]:
+                if k not in scheduled:
+                    scheduled.add(k)
+                    heapq.heappush(events, k)
+
+    while events:
+        pin = heapq.heappop(events)
+        value = evaluate_gate(
+            gate_types[pin],
+            [values[k] for k in fanin[fanin_start[pin]:fanin_start[pin+1]]],
+            1)
+
+        if value != values[pin]:
+            values[pin] = value
+            toggled.append(pin)
+            for k in fanout[fanout_start[pin]:fanout_start[pin+1]]:
+                if k not in scheduled:
+                    scheduled.add(k)
+                    heapq.heappush(events, k)
+
+    toggled.sort()
+
+    return toggled
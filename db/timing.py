@@ -0,0 +1,150 @@
+"""
+Timing simulation of a compiled netlist (db.netlist.Netlist), vectorized with
+NumPy across a batch of input vectors.
+
+The arrival time of each pin is calculated for each vector in one topological
+pass. Input pins arrive at time 0 (or at given input arrival times). A gate
+output arrives a gate delay after
+
+    the earliest of its inputs with a controlling value, if any input has a
+    controlling value (e.g. 0 for an AND or NAND gate), as that input alone
+    determines the output, or otherwise
+
+    the latest of its inputs, as all inputs are needed to determine the output.
+
+XOR gates have no controlling value. Gate outputs follow
+db.simulate.evaluate_gate, i.e. a NOT gate with several inputs is a NOR and a
+BUF gate with several inputs is an AND.
+
+This is a different delay model from the delay-defining paths of
+pathsets.Pathset.dd_paths_iterative, and arrival times are not a replacement
+for the path_delay of its results, although both use the gate delays of
+Pathset.path_length_T. NOR gates with an input of value 1 are controlled here,
+whereas Pathset.dd_path_minmax always takes the maximum through NOR gates, and
+dd_paths_iterative culls paths by their partial delays as it extends them, so
+the two differ on many vectors.
+
+Gates are evaluated in groups of the same logic level, gate type, and number of
+input pins, so each group is a single NumPy operation over gates and vectors.
+"""
+
+from db.gate_db import GateDB
+from db.netlist import (
+    GATE_TYPES,
+    GateType,
+)
+
+# Controlling input values of gate types; None if there is none.
+CONTROLLING_VALUES = {GateType.AND: 0, GateType.NAND: 0, GateType.BUF: 0,
+                      GateType.OR: 1, GateType.NOR: 1, GateType.NOT: 1,
+                      GateType.XOR: None}
+
+# Gate types whose output is the complement of the controlled value, i.e. is 1
+# if any input has the controlling value.
+INVERTING_TYPES = {GateType.NAND, GateType.NOR, GateType.NOT}
+
+
+class TimingSimulator:
+    """
+    Simulates arrival times of the pins of a netlist for batches of vectors.
+
+    netlist is db.netlist.Netlist object.
+    delays is dict of gate delays keyed by gate name; defaults to
+    GateDB.delays, the delays of Pathset.path_length_T.
+
+    The gate groups are made once, so a TimingSimulator should be reused for
+    all batches of vectors of a netlist.
+    """
+
+    def __init__(self, netlist, delays=None):
+
+        import numpy
+
+        if delays is None:
+            delays = GateDB.delays
+
+        self.netlist = netlist
+        self.delays = {GATE_TYPES[gate]: delay
+                       for gate, delay in delays.items()}
+        self.values = None
+        self.arrivals = None
+
+        groups = {}
+        for pin in range(netlist.num_inputs, len(netlist)):
+            fanin = netlist.fanin_of(pin)
+            key = (netlist.levels[pin], netlist.gate_types[pin], len(fanin))
+            groups.setdefault(key, ([], []))
+            groups[key][0].append(pin)
+            groups[key][1].append(fanin)
+
+        # List of (gate type, array of pins, 2-D array of fan-in pins) of each
+        # group, in order of level.
+        self.groups = [(GateType(gate),
+                        numpy.array(pins, dtype=numpy.intp),
+                        numpy.array(fanins, dtype=numpy.intp))
+                       for (_, gate, _), (pins, fanins)
+                       in sorted(groups.items())]
+
+    def simulate(self, input_values, input_arrivals=None):
+        """
+        Simulate a batch of vectors.
+
+        input_values is 2-D array (input pins x vectors) of the values (0 or 1)
+        of the input pins, indexed by pin ID.
+        input_arrivals is 2-D array (input pins x vectors) of the arrival times
+        of the input pins; defaults to 0.
+
+        Returns 2-D NumPy int64 array (pins x vectors) of arrival times,
+        indexed by pin ID. The values of all pins are saved in self.values, a
+        2-D NumPy bool array (pins x vectors), and the arrival times in
+        self.arrivals.
+        """
+
+        import numpy
+
+        netlist = self.netlist
+        input_values = numpy.asarray(input_values, dtype=bool)
+        if input_values.ndim != 2 or len(input_values) != netlist.num_inputs:
+            raise ValueError("TimingSimulator.simulate received input " +
+                             "values of shape " + str(input_values.shape) +
+                             " for " + str(netlist.num_inputs) +
+                             " input pins.")
+
+        num_vectors = input_values.shape[1]
+        values = numpy.zeros((len(netlist), num_vectors), dtype=bool)
+        arrivals = numpy.zeros((len(netlist), num_vectors), dtype=numpy.int64)
+        values[:netlist.num_inputs] = input_values
+        if input_arrivals is not None:
+            arrivals[:netlist.num_inputs] = input_arrivals
+
+        latest = numpy.iinfo(numpy.int64).max
+        for gate, pins, fanins in self.groups:
+            # gates x inputs x vectors
+            fanin_values = values[fanins]
+            fanin_arrivals = arrivals[fanins]
+
+            controlling = CONTROLLING_VALUES[gate]
+            if controlling is None:
+                values[pins] = (fanin_values.any(axis=1) &
+                                ~fanin_values.all(axis=1))
+                arrival = fanin_arrivals.max(axis=1)
+            else:
+                controlled = fanin_values == bool(controlling)
+                any_controlled = controlled.any(axis=1)
+                # Output value if any input has the controlling value.
+                if bool(controlling) != (gate in INVERTING_TYPES):
+                    values[pins] = any_controlled
+                else:
+                    values[pins] = ~any_controlled
+                arrival = numpy.where(
+                    any_controlled,
+                    numpy.where(controlled, fanin_arrivals,
+                                latest).min(axis=1),
+                    fanin_arrivals.max(axis=1))
+
+            arrivals[pins] = arrival + self.delays[gate]
+
+        self.values = values
+        self.arrivals = arrivals
+
+        return arrivals
@@ -0,0 +1,159 @@
+"""
+Streaming tokenizer for structural Verilog netlists. The verilog file is read
+from an mmap in fixed-size chunks, so parsing runs in linear time and in memory
+bounded by the chunk size, independent of the size of the netlist.
+
+Whitespace (including line breaks) and comments are skipped. Escaped
+identifiers that are also simple identifiers (e.g. \\N1 ) are returned without
+their leading backslash, as they name the same pin. Other escaped identifiers
+(e.g. \\N1[0] ) keep it, so that they are not taken for a bit-select (N1[0]).
+"""
+
+import mmap
+import re
+
+CHUNK_SIZE = 1 << 20
+
+# Alternatives are ordered so that whitespace and comments are tried first.
+# An unterminated block comment matches up to the end of the chunk, so that it
+# is carried over to the next chunk like any other token cut by a chunk end.
+TOKEN = re.compile(r"""
+    (?P<skip>\s+|//[^\n]*|/\*.*?(?:\*/|\Z))
+  | \\(?P<escaped>\S+)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<number>[0-9]+(?:'[sS]?[bBoOdDhH][0-9a-fA-FxXzZ_]+)?)
+  | (?P<symbol>.)
+""", re.VERBOSE | re.DOTALL)
+
+SIMPLE_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_$]*')
+
+
+def tokenize_verilog(file_verilog, chunk_size=CHUNK_SIZE):
+    """
+    Generate the tokens of verilog code.
+
+    file_verilog is an mmap (or bytes) of the verilog code.
+    chunk_size is number of bytes tokenized at a time.
+
+    Yields strings of tokens, i.e. identifiers, numbers, and single character
+    symbols such as '(', ',', and ';'.
+    """
+
+    size = len(file_verilog)
+    position = 0
+    carry = ''
+
+    while position < size or carry:
+        # Decoding one byte per character keeps chunks aligned with the file.
+        chunk = file_verilog[position:position + chunk_size]
+        chunk = carry + chunk.decode('latin-1')
+        position += chunk_size
+        last = position >= size
+
+        end = 0
+        for match in TOKEN.finditer(chunk):
+            # A token reaching the end of the chunk may continue in the next.
+            if match.end() == len(chunk) and not last:
+                break
+            end = match.end()
+
+            kind = match.lastgroup
+            if kind == 'escaped':
+                name = match.group(kind)
+                yield name if SIMPLE_IDENTIFIER.fullmatch(name) else '\\' + name
+            elif kind != 'skip':
+                yield match.group(kind)
+
+        carry = '' if last else chunk[end:]
+
+
+def statements_verilog(tokens):
+    """
+    Group tokens into statements.
+
+    tokens is an iterable of tokens, e.g. from tokenize_verilog.
+
+    Yields lists of tokens of each statement, without the terminating ';'.
+    Keywords without terminating ';' (e.g. endmodule) are yielded on their own.
+    """
+
+    statement = []
+    for token in tokens:
+        if token == ';':
+            yield statement
+            statement = []
+        elif token in ('endmodule', 'end', 'endcase') and not statement:
+            yield [token]
+        else:
+            statement.append(token)
+
+    if statement:
+        yield statement
+
+
+def split_ports(tokens):
+    """
+    Split the tokens of a parenthesised, comma-separated list of ports into
+    pin names. Bit-selects are joined with their identifiers, e.g. tokens
+    ['a', '[', '3', ']'] give the pin name 'a[3]'.
+
+    tokens is list of tokens between '(' and the matching ')'.
+    Returns list of pin names.
+    """
+
+    pins = []
+    pin = ''
+    for token in tokens:
+        if token == ',':
+            pins.append(pin)
+            pin = ''
+        else:
+            pin += token
+
+    if pin or pins:
+        pins.append(pin)
+
+    return pins
+
+
+def declared_pins(tokens):
+    """
+    Return the pin names of a declaration statement, e.g. the tokens of
+    'input N1, N2' or 'input [1:0] a, b'. Declared ranges are expanded into
+    one pin per bit, e.g. ['a[1]', 'a[0]', 'b[1]', 'b[0]'].
+
+    tokens is list of tokens of the statement, after its keyword.
+    """
+
+    msb = lsb = None
+    pins = []
+    k = 0
+    while k < len(tokens):
+        token = tokens[k]
+        if token == '[':
+            close = tokens.index(']', k)
+            msb = int(tokens[k+1])
+            lsb = int(tokens[close-1]) if tokens[k+2] == ':' else msb
+            k = close
+        elif token in (',', 'wire', 'reg', 'signed'):
+            pass
+        elif msb is None:
+            pins.append(token)
+        else:
+            step = -1 if msb >= lsb else 1
+            pins += [token + '[' + str(bit) + ']'
+                     for bit in range(msb, lsb + step, step)]
+        k += 1
+
+    return pins
+
+
+def open_verilog(filename):
+    """
+    Return an mmap of the verilog file, or empty bytes if the file is empty.
+    """
+
+    with open(filename, "rb") as file_data:
+        if not file_data.seek(0, 2):
+            return b''
+        return mmap.mmap(file_data.fileno(), 0, access=mmap.ACCESS_READ)
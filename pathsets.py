@@ -12,6 +12,16 @@
 
         verilog_path: A string path of the verilog code.
 
+        netlist: The compiled netlist (db.netlist.Netlist) of the circuit. The verilog code is parsed only once, into
+        this netlist, and all other databases are made from it.
+
+        cones: The db.cones.ConeIndex of the netlist: bitsets of the input pins in the transitive fanin and of the
+        output pins in the transitive fanout of each pin, made by make_db_cones() on first use, or None until then. It
+        does not include circuit mods.
+
+        evaluator: The generated straight-line evaluator function of the netlist (see db.evaluator), or None if
+        compile_evaluator is False. If set, it is used to simulate the circuit instead of evaluating gate by gate.
+
         const_gates: A dictionary of constants for strings to use for gates. These strings are set to four characters,
         conforming to the four character gate names used in the Verilog codes.
 
@@ -21,34 +31,105 @@
 
         db_node_pins: A set of nodes of the circuit that are not input or output pins.
 
-        db_gates: A dictionary of gates, where the keys are the output pins and the values are an object comprised of
-        a gate type and the input pins.
+        db_gates: A mapping of gates, where the keys are the output pins and the values are an object comprised of
+        a gate type and the input pins. It is a view of the compiled netlist (see db_gate_map), so the gates are not
+        stored twice; gates set or removed by circuit mods are kept as changes over the netlist.
 
-        db_node_depths: A dictionary of node depths, index by a 2tuple of (node, inputpin): {depth(s)}. Note that
+        db_node_depths: A dictionary of node depths, indexed by node then by input pin: {node: {inputpin: depths}}.
+        The depths, i.e. the numbers of gates of the paths from the input pin to the node, are saved as an integer
+        bitset in which bit k is set if there is a path of depth k, so multiple paths of the same depth are only
+        recorded once. Input pins have no entry. Use node_depths() for the depths as a set.
 
-        multiple path lengths between a node and an input pin are only recorded once, becaause it is saved as a
-        set, not a list.
+        db_depth_histograms: A 3-D NumPy array (nodes x input pins x depth bins) of path counts, indexed by netlist pin
+        ID on both pin axes, made by make_db_depth_histograms(): entry [node, inpin, depth] is the number of paths from
+        inpin to node of depth depth.
 
         db_node_values: A dictionary of node values, that is the value of all nodes in a circuit given a set of inputs
 
+        db_node_bitmaps: A dictionary of node value bitmaps for a batch of input vectors, made by bit-parallel
+        simulation. Bit k of the bitmap (an int) of a node is the value of the node for vector k.
+
+        db_num_vectors: The number of input vectors in db_node_bitmaps.
+
+        db_arrival_times: A NumPy array (pins x vectors) of the arrival times of all nodes for a batch of input vectors,
+        indexed by netlist pin ID, made by timing simulation with the gate delays of path_length_T. The timing model is
+        not that of dd_paths_iterative, so arrival times of output pins are not the path delays of db_results.
+
+        timing_simulator: The db.timing.TimingSimulator of the netlist, made on first use by make_db_arrival_times().
+
+        db_node_value_list: The values of db_node_values as a list indexed by netlist pin ID, which is kept for
+        incremental re-simulation.
+
+        db_toggled_nodes: A list of nodes that toggled in the last update_db_node_values(), in topological order.
+
+        db_affected_outputs: A set of output pins whose fanin cone contains a toggled node in the last
+        update_db_node_values(). The delay-defining paths of other output pins are unchanged.
+
         db_covered_nodes: A list of covered nodes.
 
+        db_covered_bits: The union of the covered nodes of all results in db_results, as an integer bitset in which bit
+        k is set if the node of netlist pin ID k is covered. Each db_result holds the bitset of its own covered nodes in
+        covered_bits. Nodes which are not in the netlist, i.e. those of circuit mods, have no bits.
+
+        db_num_covered: The number of nodes set in db_covered_bits.
+
+        db_node_hits: A list of the numbers of results in db_results which cover each node, indexed by netlist pin ID.
+
+        db_dd_cache: A dd_cache of the results of output pins, keyed by the values of the input pins in their fanin
+        cones, which the results depend on. dd_paths_iterative and dd_paths_outputs consult it before expanding paths.
+
+        db_cone_inputs: A dictionary of lists of the input pins in the fanin cones of output pins, keyed by output pin.
+
+        db_delay_bounds: A dictionary of the structural minimum and maximum path delays (as path_length_T) from nodes to
+        any input pin, as 2tuples keyed by node, made by make_db_delay_bounds() from db_gates independently of node
+        values.
+
         db_results: A list of results generated of the form, [result1, result2, ...]. Each class result contains
         objects: input_string, output pin, output pin value, min/max/either condition, path delay,
-        list of delay-defining paths, list of covered nodes.
+        list of delay-defining paths, list of covered nodes, bitset of covered nodes. Results are added with
+        save_db_result(), which keeps db_covered_bits, db_num_covered, and db_node_hits up to date.
 
         db_mods_circuit: A list of modifications made to the original circuit. It is assumed tha the modification occurs
         where a gate is inserted at a node. Each element is of the form
         [original pin, [pins to other inputs of inserted gate], gate type as string]
 
+The load_netlist() method parses the verilog code once into netlist, with its gates in topological order.
+
+The save_netlist_cache() method writes the netlist and the tables derived from it to the netlist cache, once they are
+made.
+
+The make_db_cones() method creates cones, the fanin and fanout cone index of the netlist.
+
+The make_db_evaluator() method creates evaluator, compiling the netlist into a generated Python function.
+
 The make_db_node_depths() method creates db_node depth, which is a dictionary of node depths of all nodes in the
-circuit.
+circuit. The node_depths() method returns the depths of a node from an input pin.
+
+The make_db_depth_histograms() method creates db_depth_histograms, counting the paths of each depth between all nodes
+and input pins, and the save_depth_histograms() method writes them to a .npy file.
 
 The make_db_node_values_rand() method creates db_node_values, based on the input pin values, using randomly generated
 numbers.
 
 The make_db_node_values() method creates db_node_values, based on pin values of the input pins in db_node_values.
 
+The prng_input_strings() method returns the input strings of the input pin values that make_db_node_values() generates
+for a range of PRNG offsets.
+
+The make_db_node_bitmaps() method creates db_node_bitmaps, simulating a batch of input strings at once. The
+node_bitmaps() method returns the bitmaps of a batch without changing db_node_bitmaps.
+
+The make_db_node_values_bitmaps() method creates db_node_values for one vector of db_node_bitmaps.
+
+The make_db_arrival_times() method creates db_arrival_times, simulating the arrival times of all nodes for a batch of
+input strings at once. These follow a controlling-value timing model, not the path delays of dd_paths_iterative.
+
+The update_db_node_values() method updates db_node_values after some input pins change, event-driven.
+
+The sweep_exhaustive_results() method determines the delay-defining paths for all input vectors, walking them in
+blocks in Gray-code order, and yields the results block by block in canonical order. The sweep_exhaustive() method
+keeps only counts of the path delays of each output pin, and optionally adds the results to db_results.
+
 The make_db_dd_paths() method fills the variable paths with paths for determining the delay-defining path.
 
 The branch_point() method returns th
@@ -62,8 +143,23 @@ The path_length_T returns the path length as number of transistors for a path, w
 The dd_paths_iterative expands the circuit tree and determines the path delay and delay-defining path(s) given the
 node values in db_node_values.
 
+The make_db_delay_bounds() method creates db_delay_bounds, the static minimum and maximum path delays from each node to
+the input pins. The delay_bounds() method returns those of a node.
+
+The dd_result() method determines the result of an output pin, reusing results in db_dd_cache of the same values of the
+input pins in its fanin cone.
+
+The dd_paths_outputs() method determines the delay-defining paths of several output pins for one set of node values,
+sharing the gate properties of their fanin cones. The paths of each output pin are still enumerated on their own.
+
 The covered_nodes receives the path delay results and determines nodes that are covered.
 
+The save_db_result() method adds a result to db_results and to the coverage of all results. The coverage(),
+uncovered_nodes(), and node_hits() methods query that coverage at any point of a run.
+
+The dd_results_batch() method determines the path delays, min/max conditions, and covered nodes of output pins for a
+batch of vectors with dd_paths_outputs(), and returns them as NumPy arrays.
+
 The mods_insert method will modify db_input_pins, db_output_pins, db_node_pins, and db_gates then rerun
 self.make_db_node_depths() to insert the circuit mods based on db_mods_circuit.
 
@@ -73,8 +169,27 @@ self.make_db_node_depths() to remove the circuit mods based on db_mods_circuit.
 """
 
 import sys
-import mmap
 import random
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from db.netlist import load_netlist
+from db.netlist_cache import (
+    load_cached_netlist,
+    save_netlist_tables
+)
+from db.evaluator import compile_evaluator
+from db.timing import TimingSimulator
+from db.depths import depth_histograms
+from db.cones import cone_index
+from db.gate_db import GateDB
+from db.simulate import (
+    bitmap_mask,
+    pack_vectors,
+    simulate_bitmaps,
+    simulate_events
+)
 
 
 class Pathset(object):
@@ -88,9 +203,68 @@ class Pathset(object):
         def __str__(self):
             return "[%s, [%s]]" % (self.gate, ', '.join([pin for pin in self.input_pins]))
 
+    class db_gate_map(MutableMapping):
+        """
+        Mapping of output pins to db_gate objects, backed by the compiled netlist as GateMap is for GateDB. Objects of
+        the netlist gates are made on access, so assigning to their attributes does not change the gate: set a new
+        db_gate object instead. Gates that are set or deleted are kept as changes over the netlist, which itself is
+        never modified.
+        """
+
+        def __init__(self, netlist, gate_class):
+            self.netlist = netlist
+            self.gate_class = gate_class
+            self.added = {}
+            self.removed = set()
+
+        def __getitem__(self, output_pin):
+            if output_pin in self.added:
+                return self.added[output_pin]
+            pin = self.netlist.pin_id.get(output_pin)
+            if pin is None or pin < self.netlist.num_inputs or output_pin in self.removed:
+                raise KeyError(output_pin)
+            pins = self.netlist.pins
+            return self.gate_class(self.netlist.gate_name(pin), [pins[k] for k in self.netlist.fanin_of(pin)])
+
+        def __setitem__(self, output_pin, gate):
+            self.added[output_pin] = gate
+            self.removed.discard(output_pin)
+
+        def __delitem__(self, output_pin):
+            if output_pin in self.added:
+                del self.added[output_pin]
+                if self.in_netlist(output_pin):
+                    self.removed.add(output_pin)
+            elif self.in_netlist(output_pin) and output_pin not in self.removed:
+                self.removed.add(output_pin)
+            else:
+                raise KeyError(output_pin)
+
+        def __iter__(self):
+            for output_pin in self.added:
+                yield output_pin
+            pins = self.netlist.pins
+            for pin in range(self.netlist.num_inputs, len(pins)):
+                if pins[pin] not in self.added and pins[pin] not in self.removed:
+                    yield pins[pin]
+
+        def __len__(self):
+            return (self.netlist.num_gates() - len(self.removed) +
+                    sum(1 for output_pin in self.added if not self.in_netlist(output_pin)))
+
+        def __contains__(self, output_pin):
+            if output_pin in self.added:
+                return True
+            return self.in_netlist(output_pin) and output_pin not in self.removed
+
+        def in_netlist(self, output_pin):
+            pin = self.netlist.pin_id.get(output_pin)
+            return pin is not None and pin >= self.netlist.num_inputs
+
     class db_result(object):
 
-        def __init__(self, input_string, output_pin, output_pin_value, minmax, path_delay, paths, covered_nodes):
+        def __init__(self, input_string, output_pin, output_pin_value, minmax, path_delay, paths, covered_nodes,
+                     covered_bits=0):
             self.input_string = input_string
             self.output_pin = output_pin
             self.output_pin_value = output_pin_value
@@ -98,6 +272,131 @@ class Pathset(object):
             self.path_delay = path_delay
             self.paths = paths
             self.covered_nodes = covered_nodes
+            self.covered_bits = covered_bits
+
+    class dd_path(object):
+        """
+        A path of the dd_paths_expand frontier, stored as a node of a prefix tree: the node holds the last pin of the
+        path and a pointer to the node of the path without its last pin, so paths with a common prefix share the nodes
+        of the prefix, and extending a path allocates a single node. Pins are the pin name objects of db_gates, shared
+        rather than copied.
+
+        delay is the path length of the path, as measured by path_length_T.
+        """
+
+        __slots__ = ('pin', 'parent', 'delay')
+
+        def __init__(self, pin, parent, delay):
+            self.pin = pin
+            self.parent = parent
+            self.delay = delay
+
+        def path(self):
+            """
+            Returns the path as a list of pins.
+            """
+
+            path = []
+            node = self
+            while node is not None:
+                path += [node.pin]
+                node = node.parent
+            path.reverse()
+
+            return path
+
+    class dd_path_store(object):
+        """
+        The paths of dd_paths_expand, as the leaves of a prefix tree of dd_path nodes, indexed by hash. The number of
+        stored paths through each node (counts), the nodes of each pin (pin_nodes, an inverted index from pins to the
+        nodes of the paths that contain them), the children of each node, and the number of occurrences of each pin in
+        the stored paths (occurrences) are maintained incrementally as paths are added, extended, and removed, at the
+        cost of one walk up the prefix tree per path touched.
+
+        Nodes are kept after all their paths are removed, with a count of 0.
+        """
+
+        def __init__(self):
+            self.paths = {}
+            self.counts = {}
+            self.children = {}
+            self.pin_nodes = {}
+            self.occurrences = {}
+
+        def _add_node(self, node):
+            self.counts[node] = 0
+            if node.pin in self.pin_nodes:
+                self.pin_nodes[node.pin] += [node]
+            else:
+                self.pin_nodes[node.pin] = [node]
+                self.occurrences[node.pin] = 0
+            if node.parent is not None:
+                if node.parent in self.children:
+                    self.children[node.parent] += [node]
+                else:
+                    self.children[node.parent] = [node]
+
+        def _count(self, node, delta):
+            while node is not None:
+                self.counts[node] += delta
+                self.occurrences[node.pin] += delta
+                node = node.parent
+
+        def add(self, path):
+            """
+            Add a path, a dd_path node, with the nodes of its prefix that are not stored yet.
+            """
+
+            node = path
+            while node is not None and node not in self.counts:
+                self._add_node(node)
+                node = node.parent
+            self.paths[path] = None
+            self._count(path, 1)
+
+        def extend(self, path, pins, delay):
+            """
+            Replace a stored path by its extensions to pins, all of path delay delay, and return the list of them.
+            """
+
+            new_paths = []
+            for pin in pins:
+                new_path = Pathset.dd_path(pin, path, delay)
+                self._add_node(new_path)
+                self.paths[new_path] = None
+                self.counts[new_path] = 1
+                self.occurrences[pin] += 1
+                new_paths += [new_path]
+
+            del self.paths[path]
+            if len(new_paths) != 1:
+                self._count(path, len(new_paths) - 1)
+
+            return new_paths
+
+        def remove(self, path):
+            """
+            Remove a stored path.
+            """
+
+            del self.paths[path]
+            self._count(path, -1)
+
+        def branch_paths(self, node):
+            """
+            Returns the list of the stored paths through node, i.e. the stored leaves below it in the prefix tree.
+            """
+
+            paths = []
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                if node in self.children:
+                    stack += self.children[node]
+                elif node in self.paths:
+                    paths += [node]
+
+            return paths
 
     class mods(object):
 
@@ -116,193 +415,268 @@ class Pathset(object):
             self.mod_num = 0
             self.array = []
 
+    class dd_cache(object):
+        """
+        A least-recently-used cache of db_results, keyed by (output pin, bits of the values of the input pins in the
+        fanin cone of the output pin). It holds at most size entries; if size is 0, nothing is cached. hits and misses
+        count the lookups.
+        """
+
+        def __init__(self, size):
+            self.size = size
+            self.entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+        def get(self, key):
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
 
+            self.misses += 1
+            return None
 
-    def __init__(self, circuit, verilog_path):
-        """ Return a new Pathset object. Initialize the set of paths. """
+        def put(self, key, result):
+            if self.size <= 0:
+                return
+
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+        def clear(self):
+            self.entries.clear()
+
+
+
+    def __init__(self, circuit, verilog_path, netlist_cache=True, compile_evaluator=False, dd_cache_size=4096,
+                 netlist=None):
+        """
+        Return a new Pathset object. Initialize the set of paths.
+
+        If netlist_cache is True, the compiled netlist and node depths are loaded from (and saved to) the on-disk
+        netlist cache, see db.netlist_cache.
+
+        If compile_evaluator is True, the circuit is simulated by a generated straight-line evaluator function, see
+        make_db_evaluator().
+
+        dd_cache_size is the number of results of output pins kept in db_dd_cache; 0 disables the cache.
+
+        If netlist is given, it is used as the compiled netlist of the circuit instead of loading the verilog code,
+        e.g. in worker processes which receive the netlist of another Pathset (see campaign.dd_paths_parallel).
+        """
 
         self.paths = []
         self.circuit = circuit
         self.verilog_path = verilog_path
+        self.netlist_cache = netlist_cache
 
         self.db_input_pins = {}
         self.db_output_pins = {}
         self.db_node_pins = {}
         self.db_gates = {}
         self.db_node_depths = {}
+        self.db_depth_histograms = None
         self.db_node_values = {}
+        self.db_node_bitmaps = {}
+        self.db_num_vectors = 0
+        self.db_arrival_times = None
+        self.timing_simulator = None
+        self.db_node_value_list = []
+        self.db_toggled_nodes = []
+        self.db_affected_outputs = set()
         self.db_init_node_values = []
         self.db_covered_nodes = []
+        self.db_covered_bits = 0
+        self.db_num_covered = 0
+        self.db_node_hits = []
+        self.db_dd_cache = self.dd_cache(dd_cache_size)
+        self.db_cone_inputs = {}
+        self.db_delay_bounds = {}
         self.db_results = []
         self.const_gates = {'and': 'and', 'nand': 'nand', 'or': 'or', 'nor': 'nor', 'not': 'not', 'xor': 'xor',
                             'buf': 'buf'}
 
         self.db_mods_circuit = self.mods()
 
+        self.netlist = netlist
+        self.cones = None
+        self.evaluator = None
+        if self.netlist is None:
+            self.load_netlist()
+
         self.make_db_input_pins()
         self.make_db_output_pins()
         self.make_db_node_pins()
         self.make_db_gates()
         self.make_db_node_depths()
 
-    def make_db_input_pins(self):
-        """ Make database of input pins from the verilog code. """
+        if compile_evaluator:
+            self.make_db_evaluator()
+
+        self.save_netlist_cache()
+
+    def load_netlist(self):
+        """
+        Parse the verilog code once into the compiled netlist, which all other methods then consume. If netlist_cache
+        is True, the netlist is loaded from the netlist cache unless the verilog code has changed.
+        """
 
         filename = self.verilog_path + "/" + self.circuit + ".v"
-        with open(filename, "r") as file_data:
-            file_verilog = mmap.mmap(file_data.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.netlist_cache:
+                # The netlist is written to the cache with its tables by save_netlist_cache().
+                self.netlist = load_cached_netlist(filename, self.circuit, save=False)
+            else:
+                self.netlist = load_netlist(filename, self.circuit)
+        except ValueError as error:
+            print("")
+            print(str(error) + " Exiting..")
+            print("")
+            sys.exit()
 
-        while True:
-            verilog_line = file_verilog.readline()
-            verilog_line = verilog_line.decode('ascii')
-            if verilog_line[0:5] == 'input':
-                break
-            elif verilog_line == "":
-                print("")
-                print('Reached EOF verilog file without ''input''! Exiting..')
-                print("")
-                file_verilog.close()
-                sys.exit()
+    def save_netlist_cache(self):
+        """
+        If netlist_cache is True, write the netlist and its tables (e.g. node depths) to the netlist cache, unless they
+        are already in it. __init__ calls it once, after the tables are made, so a cold start writes the cache once;
+        call it again to cache tables made later, e.g. by make_db_evaluator().
+        """
 
-        verilog_line = verilog_line[verilog_line.find('N'):verilog_line.find(';')]
-        self.db_input_pins = set(verilog_line.split(','))
+        if not self.netlist_cache:
+            return
 
-        file_verilog.close()
+        try:
+            save_netlist_tables(self.netlist)
+        except (OSError, ValueError):
+            print('Could not write netlist cache for ' + self.circuit)
 
-    def make_db_output_pins(self):
-        """ Make database of output pins from the verilog code. """
+    def make_db_cones(self, cache=False):
+        """
+        Make cones, the index of the transitive fanin input pins and fanout output pins of each pin of the netlist, as
+        integer bitsets (see db.cones). It is made on first use by cone_inputs() and update_db_node_values(), as it
+        takes a bit per pin and input pin.
 
-        filename = self.verilog_path + "/" + self.circuit + ".v"
-        with open(filename, "r") as file_data:
-            file_verilog = mmap.mmap(file_data.fileno(), 0, access=mmap.ACCESS_READ)
+        If cache is True, the index is also saved in the netlist tables and, if netlist_cache is True, with the netlist
+        cache by the next save_netlist_cache(), so it is only made once per circuit. An index found in the netlist
+        tables is always reused.
+        """
 
-        while True:
-            verilog_line = file_verilog.readline()
-            verilog_line = verilog_line.decode('ascii')
-            if verilog_line[0:6] == 'output':
-                break
-            elif verilog_line == "":
-                print("")
-                print('Reached EOF verilog file without ''output''! Exiting..')
-                print("")
-                file_verilog.close()
-                sys.exit()
+        self.cones = cone_index(self.netlist, cache)
 
-        verilog_line = verilog_line[verilog_line.find('N'):verilog_line.find(';')]
-        self.db_output_pins = set(verilog_line.split(','))
+    def make_db_evaluator(self):
+        """
+        Compile the netlist into a generated Python function with one assignment per gate, in topological order (see
+        db.evaluator), and save it as evaluator. make_db_node_values() and make_db_node_bitmaps() then use it instead of
+        evaluating the gates one by one.
 
-        file_verilog.close()
+        The compiled code is saved in the netlist tables and, if netlist_cache is True, with the netlist cache (see
+        save_netlist_cache()), so it is only generated once per circuit.
+        """
 
-    def make_db_node_pins(self):
-        """ Make database of node pins from the verilog code. """
+        self.evaluator = compile_evaluator(self.netlist)
 
-        filename = self.verilog_path + "/" + self.circuit + ".v"
-        with open(filename, "r") as file_data:
-            file_verilog = mmap.mmap(file_data.fileno(), 0, access=mmap.ACCESS_READ)
+    def make_db_input_pins(self):
+        """ Make database of input pins from the compiled netlist. """
 
-        while True:
-            verilog_line = file_verilog.readline()
-            verilog_line = verilog_line.decode('ascii')
-            if verilog_line[0:4] == 'wire':
-                break
-            elif verilog_line == "":
-                print("")
-                print('Reached EOF verilog file without ''wire''! Exiting..')
-                print("")
-                file_verilog.close()
-                sys.exit()
+        self.db_input_pins = set(self.netlist.input_pins)
 
-        self.db_node_pins = set()
+    def make_db_output_pins(self):
+        """ Make database of output pins from the compiled netlist. """
 
-        while True:
-            if ';' in verilog_line:
-                verilog_line = verilog_line[verilog_line.find('N'):verilog_line.find(';')]
-                self.db_node_pins |= set(verilog_line.split(','))
-                break
-            else:
-                verilog_line = verilog_line[verilog_line.find('N'):-3]
-                self.db_node_pins |= set(verilog_line.split(','))
-                verilog_line = file_verilog.readline()
-                verilog_line = verilog_line.decode('ascii')
+        self.db_output_pins = set(self.netlist.output_pins)
 
-        file_verilog.close()
+    def make_db_node_pins(self):
+        """ Make database of node pins from the compiled netlist. """
+
+        self.db_node_pins = set(self.netlist.node_pins)
 
     def make_db_gates(self):
-        """ Make database of gates from the verilog code. """
+        """ Make database of gates as a view of the compiled netlist, see db_gate_map. """
 
-        filename = self.verilog_path + "/" + self.circuit + ".v"
-        with open(filename, "r") as file_data:
-            file_verilog = mmap.mmap(file_data.fileno(), 0, access=mmap.ACCESS_READ)
+        self.db_gates = self.db_gate_map(self.netlist, self.db_gate)
 
-        while True:
-            verilog_line = file_verilog.readline()
-            verilog_line = verilog_line.decode('ascii')
-            if verilog_line[0:verilog_line.find(" ")] in self.const_gates:
-                gate = verilog_line[0:verilog_line.find(" ")]
-                verilog_line = verilog_line[verilog_line.find('(')+1:verilog_line.find(')')]
-                verilog_line = verilog_line.split(', ')
-                outpin = verilog_line[0]
-                inpin = verilog_line[1:]
-                self.db_gates[outpin] = self.db_gate(gate, inpin)
-
-            elif verilog_line == "":
-                break
+    def make_db_node_depths(self):
+        """
+        Make database of node depths from the compiled netlist, saved as a dict of dicts: db_node_depths[node][inpin]
+        is the bitset of the depths of node from input pin inpin. The map of a gate is made from the maps of its input
+        pins, shifted by one gate, in one pass over the gates in topological order, so there is no need to search the
+        maps of other nodes. Note that as the netlist gates are in topological order, new pins are introduced only after
+        their input pins have also been introduced. However, the algorithm will catch such mistakes anyway, checking
+        that the input pins to a new gate already have their node depths defined. Note that an output pin should never
+        show up in more than one gate.
+
+        The node depths are saved in the netlist tables and, if netlist_cache is True, with the netlist cache (see
+        save_netlist_cache()), so they are only calculated once per circuit.
+        """
 
-        file_verilog.close()
+        if 'node_depth_maps' in self.netlist.tables:
+            self.db_node_depths = self.netlist.tables['node_depth_maps']
+            return
 
-    def make_db_node_depths(self):
+        node_depths = {}
+        for outpin, gate, inpins in self.netlist.gates():
+
+            if any(inpin not in self.db_input_pins and inpin not in node_depths for inpin in inpins):
+                print("")
+                print("Pins found while creating db_node_depths that were out of order. Please check the verilog" +
+                      "code")
+                print("")
+                sys.exit()
+
+            depths = {}
+            for inpin in inpins:
+                if inpin in self.db_input_pins:
+                    depths[inpin] = depths.get(inpin, 0) | 0b10
+                else:
+                    for pin, bits in node_depths[inpin].items():
+                        depths[pin] = depths.get(pin, 0) | bits << 1
+            node_depths[outpin] = depths
+
+        self.db_node_depths = node_depths
+
+        self.netlist.tables['node_depth_maps'] = self.db_node_depths
+
+    def node_depths(self, node, inpin):
         """
-        Make database of node depths from the verilog code, saved as a dict. Each key consists of a 2tuple of
-        (node, input pin) and the value is a set of depths (there may be more than one path to reach an input
-        pin). Note that as the verilog code is written where new pins are introduced only after their input pins
-        have also been introduced, there is no need to check that the input pins are already listed in the dict.
-        However, the algorithm will catch such mistakes anyway, checking that the input pins to a new gate already
-        have their node depths defined. Note that an output pin should never show up in more than one gate.
+        Returns the set of depths of node from input pin inpin, i.e. the numbers of gates of the paths between them,
+        from db_node_depths. The set is empty if there is no path.
         """
 
-        filename = self.verilog_path + "/" + self.circuit + ".v"
-        with open(filename, "r") as filedata:
-            file_verilog = mmap.mmap(filedata.fileno(), 0, access=mmap.ACCESS_READ)
+        bits = self.db_node_depths.get(node, {}).get(inpin, 0)
 
-        while True:
-            verilog_line = file_verilog.readline()
-            verilog_line = verilog_line.decode('ascii')
+        depths = set()
+        while bits:
+            depth = bits.bit_length() - 1
+            depths.add(depth)
+            bits ^= 1 << depth
 
-            if verilog_line[0:verilog_line.find(' ')] in self.const_gates.values():
+        return depths
 
-                verilog_line = verilog_line[verilog_line.find('(')+1:verilog_line.find(')')]
-                verilog_line = verilog_line.split(', ')
+    def make_db_depth_histograms(self, path_delays=False, max_depth=None):
+        """
+        Make db_depth_histograms from the compiled netlist in one topological pass, vectorized with NumPy (see
+        db.depths). Unlike db_node_depths, paths of the same depth are counted, not only recorded.
 
-                outpin = verilog_line[0]
-                inpins = verilog_line[1:]
+        path_delays: If True, depths are path delays as measured by path_length_T instead of numbers of gates, so the
+        histograms of the output pins, summed over the input pins, are the path delay counts of symmpathcountSQL.
+        max_depth: The largest depth binned; by default, that of the deepest path.
+        """
 
-                if not set(inpins).issubset(set(self.db_input_pins) | set(j[0] for j in self.db_node_depths.keys())):
-                    print("")
-                    print("Pins found while creating db_node_depths that were out of order. Please check the verilog" +
-                          "code")
-                    print("")
-                    file_verilog.close()
-                    sys.exit()
+        self.db_depth_histograms = depth_histograms(self.netlist, GateDB.delays if path_delays else None, max_depth)
 
-                for inpin in inpins:
-                    if inpin in self.db_input_pins:
-                        if (outpin, inpin) in self.db_node_depths:
-                            self.db_node_depths[(outpin, inpin)] |= {1}
-                        else:
-                            self.db_node_depths[(outpin, inpin)] = {1}
-                    else:
-                        new_node_depths = {j: self.db_node_depths[j] for j in self.db_node_depths if j[0] == inpin}
+    def save_depth_histograms(self, filename):
+        """
+        Write db_depth_histograms to a NumPy .npy file, e.g. c17_depths.npy, making them first if needed.
+        """
 
-                        for j in new_node_depths:
-                            if (outpin, j[1]) in self.db_node_depths:
-                                self.db_node_depths[outpin, j[1]] |= {k+1 for k in new_node_depths[inpin, j[1]]}
-                            else:
-                                self.db_node_depths[outpin, j[1]] = {k+1 for k in new_node_depths[inpin, j[1]]}
+        import numpy
 
-            elif verilog_line == '':
-                break
+        if self.db_depth_histograms is None:
+            self.make_db_depth_histograms()
 
-        file_verilog.close()
+        numpy.save(filename, self.db_depth_histograms)
 
     def make_db_node_values(self, initialization = 'None', PRNG_seed = 0, PRNG_offset_initial = 0):
         """
@@ -324,61 +698,307 @@ class Pathset(object):
             if PRNG_offset_initial * len(self.db_input_pins) > 0:
                 random.getrandbits(PRNG_offset_initial * len(self.db_input_pins))
 
-            input_pin_list_sorted = sorted(self.db_input_pins, key=lambda number: int(number[1:]))
+            input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
 
             self.db_node_values[input_pin_list_sorted[0]] = 0
             for j in input_pin_list_sorted:
                 self.db_node_values[j] = random.getrandbits(1)
 
         self.db_init_node_values = [[j, self.db_node_values[j]]
-                                    for j in sorted(self.db_node_values, key=lambda number: int(number[1:]))
-                                    if j in self.db_input_pins]
-
-        filename = self.verilog_path + "/" + self.circuit + ".v"
-        with open(filename, "r") as filedata:
-            file_verilog = mmap.mmap(filedata.fileno(), 0, access=mmap.ACCESS_READ)
-
-        while True:
-            verilog_line = file_verilog.readline()
-            verilog_line = verilog_line.decode('ascii')
+                                    for j in self.netlist.natural_sorted(self.db_input_pins)
+                                    if j in self.db_node_values]
+
+        # Evaluate the gates by pin ID; the netlist numbers gates in topological order.
+        netlist = self.netlist
+        pins = netlist.pins
+        fanin = netlist.fanin
+        fanin_start = netlist.fanin_start
+
+        values = [None] * len(pins)
+        for pin in range(netlist.num_inputs):
+            try:
+                values[pin] = self.db_node_values[pins[pin]]
+            except KeyError:
+                print("Pins were not already determined when running make_db_node_values, " +
+                      "particularly: " + str([j for j in pins[:netlist.num_inputs] if j not in self.db_node_values]) +
+                      "\n")
+                print('Exiting...' + "\n")
+                sys.exit()
 
-            if verilog_line[0:verilog_line.find(' ')] in self.const_gates.keys():
-                gate = verilog_line[0:verilog_line.find(' ')]
-                verilog_line = verilog_line[verilog_line.find('(')+1:verilog_line.find(')')]
-                verilog_line = verilog_line.split(', ')
-                outpin = verilog_line[0]
-                inpins = verilog_line[1:]
+        if self.evaluator is not None:
+            values = self.evaluator(values[:netlist.num_inputs], 1)
 
-                try:
-                    inpins_values = {self.db_node_values[j] for j in inpins}
-                except KeyError:
-                    file_verilog.close()
-                    print("Pins were not already determined when running make_db_node_values, " +
-                          "particularly: " + str([j for j in inpins if j not in self.db_node_values]) + "\n")
-                    print('Exiting...' + "\n")
+        else:
+            for pin in range(netlist.num_inputs, len(pins)):
+                inpins_values = {values[k] for k in fanin[fanin_start[pin]:fanin_start[pin+1]]}
+                gate = netlist.gate_name(pin)
 
                 try:
                     output = self.gate_output(gate, inpins_values)
                 except KeyError:
-                    file_verilog.close()
                     print("Unknown gate type encountered, particularly: " + gate + "\n")
                     print("Exiting..." + "\n")
+                    sys.exit()
 
-                self.db_node_values[outpin] = output
+                values[pin] = output
 
-            elif verilog_line[0:9] == 'endmodule':
-                break
+        self.db_node_values.update(zip(pins, values))
+        self.db_node_value_list = values
 
-        try:
-            if any(j not in self.db_input_pins | self.db_output_pins | self.db_node_pins for j in self.db_node_values):
-                file_verilog.close()
-                raise KeyError("Some nodes were not evaluated when running make_db_node_pins, namely:" +
-                               str([j for j in self.db_input_pins | self.db_output_pins | self.db_node_pins
-                                    if j not in self.db_node_values]) + "\n" + "Exiting..." + "\n")
-        finally:
-            pass
+        all_pins = self.db_input_pins | self.db_output_pins | self.db_node_pins
+        if any(j not in all_pins for j in self.db_node_values):
+            raise KeyError("Some nodes were not evaluated when running make_db_node_pins, namely:" +
+                           str([j for j in all_pins if j not in self.db_node_values]) + "\n" + "Exiting..." + "\n")
+
+    def prng_input_strings(self, PRNG_seed=0, PRNG_offset_initial=0, num_vectors=1):
+        """
+        Return a list of input strings (input pin values in natural order of the input pins, as in db_result) that
+        make_db_node_values('PRNG', PRNG_seed, PRNG_offset) generates, for PRNG_offset from PRNG_offset_initial to
+        PRNG_offset_initial + num_vectors - 1. The global PRNG state is not changed.
+
+        PRNG_seed: Seed for PRNG
+        PRNG_offset_initial: Offset count of first vector.
+        num_vectors: Number of vectors.
+        """
+
+        prng = random.Random()
+        num_pins = len(self.db_input_pins)
+
+        input_strings = []
+        for PRNG_offset in range(PRNG_offset_initial, PRNG_offset_initial + num_vectors):
+            prng.seed(PRNG_seed)
+            if PRNG_offset * num_pins > 0:
+                prng.getrandbits(PRNG_offset * num_pins)
+            input_strings += [''.join(str(prng.getrandbits(1)) for _ in range(num_pins))]
+
+        return input_strings
+
+    def make_db_node_bitmaps(self, input_strings):
+        """
+        Determine the values of all nodes in the circuit for a batch of input vectors at once, using bit-parallel
+        simulation (see db.simulate). Each gate is evaluated once for the whole batch.
+
+        input_strings: A list of input strings, i.e. values of the input pins in natural order of the input pins, e.g.
+        from prng_input_strings().
+
+        Creates db_node_bitmaps and db_num_vectors.
+        """
+
+        self.db_node_bitmaps = dict(zip(self.netlist.pins, self.node_bitmaps(input_strings)))
+        self.db_num_vectors = len(input_strings)
+
+    def node_bitmaps(self, input_strings):
+        """
+        Returns the list of the value bitmaps of all nodes for a batch of input strings, indexed by netlist pin ID, as
+        make_db_node_bitmaps() but without changing db_node_bitmaps.
+        """
+
+        input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
+        bitmaps = dict(zip(input_pin_list_sorted, pack_vectors(input_strings, len(input_pin_list_sorted))))
+
+        pins = self.netlist.pins
+        input_bitmaps = [bitmaps[pins[pin]] for pin in range(self.netlist.num_inputs)]
+        if self.evaluator is not None:
+            return self.evaluator(input_bitmaps, bitmap_mask(len(input_strings)))
+
+        return simulate_bitmaps(self.netlist, input_bitmaps, bitmap_mask(len(input_strings)))
+
+    def make_db_arrival_times(self, input_strings):
+        """
+        Determine the arrival times of all nodes in the circuit for a batch of input vectors at once, by timing
+        simulation vectorized with NumPy (see db.timing). A gate output arrives after the earliest of its inputs with a
+        controlling value, if any, and otherwise after the latest of its inputs, with the gate delays of path_length_T.
+
+        Note that this is a different delay model from dd_paths_iterative, and not a replacement for the path_delay of
+        its results: NOR gates are controlled by an input of value 1 here but always take the maximum in
+        dd_path_minmax, and dd_paths_iterative culls paths by their partial delays. See db.timing.
+
+        input_strings: A list of input strings, i.e. values of the input pins in natural order of the input pins, e.g.
+        from prng_input_strings().
+
+        Creates db_arrival_times. The arrival time of node k for input_strings[j] is
+        db_arrival_times[netlist.pin_id[k], j].
+        """
 
-        file_verilog.close()
+        if self.timing_simulator is None:
+            self.timing_simulator = TimingSimulator(self.netlist)
+
+        input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
+        input_values = {pin: [int(input_string[j]) for input_string in input_strings]
+                        for j, pin in enumerate(input_pin_list_sorted)}
+
+        pins = self.netlist.pins
+        self.db_arrival_times = self.timing_simulator.simulate(
+            [input_values[pins[pin]] for pin in range(self.netlist.num_inputs)])
+
+    def make_db_node_values_bitmaps(self, vector):
+        """
+        Create db_node_values (and db_init_node_values) from the values of vector number vector in db_node_bitmaps, so
+        that the vector can be analyzed by dd_paths_iterative as if created by make_db_node_values().
+
+        vector: Index of the vector in the batch of make_db_node_bitmaps(), from 0 to db_num_vectors - 1.
+        """
+
+        if not 0 <= vector < self.db_num_vectors:
+            raise IndexError("Vector " + str(vector) + " not in db_node_bitmaps of " + str(self.db_num_vectors) +
+                             " vectors.")
+
+        for pin, bitmap in self.db_node_bitmaps.items():
+            self.db_node_values[pin] = (bitmap >> vector) & 1
+
+        self.db_node_value_list = [self.db_node_values[pin] for pin in self.netlist.pins]
+        self.db_init_node_values = [[j, self.db_node_values[j]]
+                                    for j in self.netlist.natural_sorted(self.db_input_pins)]
+
+    def update_db_node_values(self, input_values):
+        """
+        Update db_node_values after the values of some input pins change. Changes are propagated event-driven, only
+        through the fanout of nodes that actually toggle (see db.simulate.simulate_events), which is much faster than
+        make_db_node_values() when only a few input pins change between consecutive vectors.
+
+        If db_node_values has not been made yet, all nodes are evaluated with make_db_node_values().
+
+        input_values: A dictionary of new values of input pins, e.g. {'N1': 1, 'N6': 0}.
+
+        Creates db_toggled_nodes and db_affected_outputs.
+        """
+
+        netlist = self.netlist
+
+        if any(pin not in self.db_input_pins for pin in input_values):
+            raise KeyError("update_db_node_values received pins that are not input pins: " +
+                           str([pin for pin in input_values if pin not in self.db_input_pins]))
+
+        if len(self.db_node_value_list) != len(netlist.pins):
+            previous_values = dict(self.db_node_values)
+            self.db_node_values.update(input_values)
+            self.make_db_node_values()
+            toggled = [pin for pin in range(len(netlist.pins))
+                       if previous_values.get(netlist.pins[pin]) != self.db_node_value_list[pin]]
+        else:
+            toggled = simulate_events(netlist, self.db_node_value_list,
+                                      {netlist.pin_id[pin]: value for pin, value in input_values.items()})
+            for pin in toggled:
+                self.db_node_values[netlist.pins[pin]] = self.db_node_value_list[pin]
+
+            self.db_init_node_values = [[j, self.db_node_values[j]]
+                                        for j in netlist.natural_sorted(self.db_input_pins)]
+
+        self.db_toggled_nodes = [netlist.pins[pin] for pin in toggled]
+        if self.cones is None:
+            self.make_db_cones()
+        self.db_affected_outputs = {netlist.pins[pin] for pin in self.cones.affected_outputs(toggled)
+                                    if netlist.pins[pin] in self.db_output_pins}
+
+    def sweep_exhaustive_results(self, output_pins=None, block_bits=12):
+        """
+        Determines the delay-defining paths of output pins for all input vectors. Generator of 2tuples of (testcase,
+        list of db_results of output_pins), in canonical binary order, as applied by the exhaustive runscripts:
+        testcase k sets input pin number j (in natural order) to (k >> j) & 1. Results are not added to db_results.
+
+        The testcases are walked in blocks of 2**block_bits testcases which share the values of the higher input pins.
+        Within a block, the lower input pins are walked in Gray-code order, so exactly one input pin flips per step,
+        forwards and backwards in turn, so the lower input pins do not change between blocks either. Node values are
+        updated incrementally with update_db_node_values(), and an output pin is only re-analyzed if its fanin cone
+        contains a toggled node; otherwise its previous result is reused. The results of a block are yielded in
+        canonical order once the block is done, so only the results of one block are held at a time.
+
+        output_pins: list of output pins to analyze, by default all output pins, in natural order.
+        block_bits: number of lower input pins walked in Gray-code order within a block.
+        """
+
+        input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
+        if output_pins is None:
+            output_pins = self.netlist.natural_sorted(self.db_output_pins)
+
+        block_bits = min(block_bits, len(input_pin_list_sorted))
+        block_size = 2**block_bits
+        num_blocks = 2**(len(input_pin_list_sorted) - block_bits)
+
+        input_values = [0] * len(input_pin_list_sorted)
+        self.update_db_node_values({pin: 0 for pin in input_pin_list_sorted})
+
+        last_results = {}
+        low = 0
+        for block in range(num_blocks):
+            # Set the higher input pins to the bits of block.
+            changes = {}
+            for j in range(block_bits, len(input_pin_list_sorted)):
+                value = (block >> (j - block_bits)) & 1
+                if input_values[j] != value:
+                    input_values[j] = value
+                    changes[input_pin_list_sorted[j]] = value
+
+            block_results = [None] * block_size
+            steps = range(block_size) if block % 2 == 0 else range(block_size - 1, -1, -1)
+            for step in steps:
+                # Gray codes of consecutive steps differ in one bit.
+                gray = step ^ (step >> 1)
+                if gray != low:
+                    flip = (gray ^ low).bit_length() - 1
+                    input_values[flip] ^= 1
+                    changes[input_pin_list_sorted[flip]] = input_values[flip]
+                    low = gray
+                if changes:
+                    self.update_db_node_values(changes)
+                    changes = {}
+
+                input_string = ''.join(str(value) for value in input_values)
+
+                # Analyze the output pins whose fanin cone toggled, sharing their gate properties.
+                new_results = self.dd_paths_outputs([pin for pin in output_pins
+                                                     if pin not in last_results or pin in self.db_affected_outputs],
+                                                    save_results=False)
+                new_results = {result.output_pin: result for result in new_results}
+
+                results = []
+                for pin in output_pins:
+                    if pin in new_results:
+                        result = new_results[pin]
+                    else:
+                        result = last_results[pin]
+                        result = self.db_result(input_string, result.output_pin, result.output_pin_value,
+                                                result.minmax, result.path_delay, result.paths, result.covered_nodes,
+                                                result.covered_bits)
+                    last_results[pin] = result
+                    results += [result]
+
+                block_results[gray] = results
+
+            for gray, results in enumerate(block_results):
+                yield block * block_size + gray, results
+
+    def sweep_exhaustive(self, output_pins=None, save_results=True, block_bits=12):
+        """
+        Determines the delay-defining paths of output pins for all input vectors, as sweep_exhaustive_results(), and
+        keeps only running aggregates of the results in memory.
+
+        output_pins: list of output pins to analyze, by default all output pins, in natural order.
+        save_results: If True, add results to db_results (if they do not already exist) in order of testcase, then
+        of output_pins. Note that db_results then holds all results; for many input pins, use save_results=False, or
+        write the results of sweep_exhaustive_results() as they are yielded.
+        block_bits: number of lower input pins walked in Gray-code order within a block.
+
+        Returns a dictionary keyed by output pin of dictionaries of path delays to the number of testcases with that
+        path delay.
+        """
+
+        if output_pins is None:
+            output_pins = self.netlist.natural_sorted(self.db_output_pins)
+
+        path_delay_counts = {pin: {} for pin in output_pins}
+        results_written = {(result.input_string, result.output_pin) for result in self.db_results}
+
+        for testcase, results in self.sweep_exhaustive_results(output_pins, block_bits):
+            for result in results:
+                counts = path_delay_counts[result.output_pin]
+                counts[result.path_delay] = counts.get(result.path_delay, 0) + 1
+
+                if save_results and (result.input_string, result.output_pin) not in results_written:
+                    results_written.add((result.input_string, result.output_pin))
+                    self.save_db_result(result)
+
+        return path_delay_counts
 
     def dd_path_value(self, gate, inputs):
         """
@@ -458,6 +1078,8 @@ class Pathset(object):
                 return "max"
         elif gate == self.const_gates['not']:
             return "either"
+        elif gate == self.const_gates['buf']:
+            return "either"
         elif gate == self.const_gates['xor']:
             return "either"
 
@@ -504,6 +1126,11 @@ class Pathset(object):
                 return 0
             else:
                 return 1
+        elif gate == 'buf':
+            if any(j == 0 for j in inputs):
+                return 0
+            else:
+                return 1
         elif gate == 'xor':
             if 0 in inputs and 1 in inputs:
                 return 1
@@ -546,21 +1173,28 @@ class Pathset(object):
         path_length = 0
         for step in range(len(path)-1):
             output_node = path[step]
-            gate = self.db_gates[output_node].gate
-
-            if gate in {'nand', 'nor', 'xor', 'not'}:
-                path_length += 1
-            elif gate in {'and', 'or', 'buf'}:
-                path_length += 2
-            else:
-                print("")
-                print("Unknown gates found when running path_length_T, namely: ", gate, ".")
-                print("Exiting...")
-                print("")
-                sys.exit()
+            path_length += self.gate_length_T(self.db_gates[output_node].gate)
 
         return path_length
 
+    def gate_length_T(self, gate):
+        """
+        Determines the path length through a gate, measured as number of transistors, as used by path_length_T.
+
+        gate: A string, which must be one of the values listed in const_gates, which is the gate being used.
+        """
+
+        if gate in {'nand', 'nor', 'xor', 'not'}:
+            return 1
+        elif gate in {'and', 'or', 'buf'}:
+            return 2
+        else:
+            print("")
+            print("Unknown gates found when running path_length_T, namely: ", gate, ".")
+            print("Exiting...")
+            print("")
+            sys.exit()
+
     def dd_paths_iterative(self, paths):
         """
         Determines iteratively the paths which are the delay-defining paths. At each iteration, extend paths to the
@@ -572,28 +1206,208 @@ class Pathset(object):
         paths: list of paths being evaluated, i.e. [['N2', 'N1'], ['N4', 'N3', 'N1'],...]. This will likely start out
         as just an output pin. Output pins are first, then nodes that head toward the input pins.
 
-        Add result to db_results.
+        Add result to db_results and return the delay-defining paths. If paths is a single output pin, the result is
+        taken from db_dd_cache if possible, see dd_result().
+        """
+
+        if len(paths) == 1 and len(paths[0]) == 1 and paths[0][0] in self.db_gates and self.db_dd_cache.size > 0:
+            input_string = self.input_string()
+            result = self.dd_result(paths[0][0], input_string)
+
+            if not any([entry for entry in self.db_results if entry.input_string == input_string and
+                        entry.output_pin == result.output_pin]):
+                self.db_covered_nodes = result.covered_nodes
+                self.save_db_result(result)
+
+            return result.paths
+
+        save_paths = self.dd_paths_expand(paths)
+        self.add_db_result(save_paths)
+
+        return save_paths
+
+    def cone_inputs(self, output_pin):
+        """
+        Returns the list of the input pins in the fanin cone of output_pin, in natural order, saved in db_cone_inputs.
+        The cone is taken from the cone index unless the circuit has mods.
         """
 
+        if (output_pin not in self.db_cone_inputs and not self.db_mods_circuit.mod_num and
+                output_pin in self.netlist.pin_id):
+            if self.cones is None:
+                self.make_db_cones()
+            pins = self.netlist.pins
+            self.db_cone_inputs[output_pin] = self.netlist.natural_sorted(
+                [pins[pin] for pin in self.cones.input_pins(self.cones.fanin_inputs[self.netlist.pin_id[output_pin]])])
+
+        if output_pin not in self.db_cone_inputs:
+            cone = {output_pin}
+            stack = [output_pin]
+            while stack:
+                pin = stack.pop()
+                if pin in self.db_gates:
+                    for input_pin in self.db_gates[pin].input_pins:
+                        if input_pin not in cone:
+                            cone.add(input_pin)
+                            stack += [input_pin]
+
+            self.db_cone_inputs[output_pin] = self.netlist.natural_sorted([pin for pin in cone
+                                                                          if pin in self.db_input_pins])
+
+        return self.db_cone_inputs[output_pin]
+
+    def make_db_delay_bounds(self):
+        """
+        Make db_delay_bounds, the structural minimum and maximum path delays from each node to any input pin, i.e. of
+        path_length_T of the paths from the node through db_gates to the input pins, whatever the node values. Input
+        pins have bounds (0, 0), and a gate output has the path length of its gate (see gate_length_T) plus the minimum
+        and maximum bounds of its input pins.
+
+        The bounds are made once per circuit, in one pass over db_gates, and are made again after circuit mods.
+        """
+
+        bounds = {pin: (0, 0) for pin in self.db_input_pins}
+
+        for output_pin in self.db_gates:
+            # Depth-first, so the bounds of the input pins of a gate are made before those of its output.
+            stack = [output_pin]
+            while stack:
+                pin = stack[-1]
+                if pin in bounds:
+                    stack.pop()
+                    continue
+
+                gate = self.db_gates[pin]
+                input_pins = [input_pin for input_pin in gate.input_pins if input_pin not in bounds]
+                if input_pins:
+                    stack += input_pins
+                    continue
+
+                stack.pop()
+                gate_length = self.gate_length_T(gate.gate)
+                input_bounds = [bounds[input_pin] for input_pin in gate.input_pins]
+                bounds[pin] = (gate_length + min(bound[0] for bound in input_bounds),
+                               gate_length + max(bound[1] for bound in input_bounds))
+
+        self.db_delay_bounds = bounds
+
+    def delay_bounds(self, node):
+        """
+        Returns the 2tuple of the structural minimum and maximum path delays from node to any input pin, from
+        db_delay_bounds, which is made first if needed (see make_db_delay_bounds()). Whatever the node values, the path
+        delays of the delay-defining paths from node lie within these bounds.
+        """
+
+        if not self.db_delay_bounds:
+            self.make_db_delay_bounds()
+
+        return self.db_delay_bounds[node]
+
+    def dd_result(self, output_pin, input_string, dd_gates=None):
+        """
+        Returns the db_result of the delay-defining paths of output_pin, given the node values in db_node_values. The
+        result only depends on the values of the input pins in the fanin cone of output_pin, so a result of the same
+        values is taken from db_dd_cache if possible, with input_string as its input string. Otherwise, the paths are
+        expanded with dd_paths_expand and the result is added to db_dd_cache.
+
+        output_pin: output pin to analyze.
+        input_string: input string of the result.
+        dd_gates: dictionary of gate properties passed to dd_paths_expand.
+        """
+
+        bits = 0
+        for pin in self.cone_inputs(output_pin):
+            bits = bits << 1 | self.db_node_values[pin]
+
+        result = self.db_dd_cache.get((output_pin, bits))
+
+        if result is None:
+            result = self.make_db_result(self.dd_paths_expand([[output_pin]], dd_gates), input_string)
+            self.db_dd_cache.put((output_pin, bits), result)
+        elif result.input_string != input_string:
+            result = self.db_result(input_string, result.output_pin, result.output_pin_value, result.minmax,
+                                    result.path_delay, result.paths, result.covered_nodes, result.covered_bits)
+
+        return result
+
+    def dd_gate(self, output_pin):
+        """
+        Determines the properties of the gate driving output_pin that dd_paths_expand needs to extend paths through it,
+        given the node values in db_node_values.
+
+        Returns a 4tuple of the path length through the gate (see gate_length_T), the min/max condition of the gate
+        (see dd_path_minmax), the list of its delay-defining input pins (see dd_path_value), and the list of those
+        delay-defining input pins which are input pins of the circuit.
+        """
+
+        output_value = self.db_node_values[output_pin]
+        db_gate = self.db_gates[output_pin]
+        gate = db_gate.gate
+        input_pins = db_gate.input_pins
+        input_values = [self.db_node_values[pin] for pin in input_pins]
+        min_max = self.dd_path_minmax(gate, output_value)
+
+        # Keep paths that are delay-defining and remove others
+        dd_value = self.dd_path_value(gate, input_values)
+        input_pins = [pin for pin in input_pins if self.db_node_values[pin] in dd_value]
+
+        return (self.gate_length_T(gate), min_max, input_pins,
+                [pin for pin in input_pins if pin in self.db_input_pins])
+
+    def dd_paths_expand(self, paths, dd_gates=None):
+        """
+        Expands the paths as described in dd_paths_iterative, given the node values in db_node_values, without adding
+        a result to db_results.
+
+        Each path of the frontier is a dd_path node of a prefix tree, which carries its delay, so paths are extended by
+        allocating a single node, and the delays of extended paths and of path slices from branch points are calculated
+        in constant time instead of with path_length_T. Paths are only made into lists when returned.
+
+        The paths are kept in a dd_path_store, which maintains the numbers of occurrences of nodes as paths are
+        extended and culled, instead of recounting them over all paths at each iteration, and finds the paths through a
+        branch node from its inverted index, so culling only touches the paths through the branch nodes.
+
+        The properties of the gates that paths are extended through are determined once per gate with dd_gate(), and
+        saved in dd_gates, which may be shared by several calls for the same node values; see dd_paths_outputs().
+
+        paths: list of paths being evaluated, as in dd_paths_iterative.
+        dd_gates: dictionary of the results of dd_gate(), keyed by output pin, for the node values in db_node_values.
+
+        Returns the list of delay-defining paths.
+        """
+
+        if dd_gates is None:
+            dd_gates = {}
+
         save_paths = []
 
+        # Paths, and the numbers of occurrences of nodes in them, are kept up to date in store as they are extended and
+        # culled.
+        store = self.dd_path_store()
+        root_paths = []
+        for path in paths:
+            node = None
+            for pin in path:
+                delay = 0 if node is None else node.delay + self.gate_length_T(self.db_gates[node.pin].gate)
+                node = self.dd_path(pin, node, delay)
+            store.add(node)
+            root_paths += [node]
+        paths = root_paths
+
         path_length = 0
-        while any(path[-1] not in self.db_input_pins for path in paths):
+        while any(path.pin not in self.db_input_pins for path in paths):
 
             # Extend all paths by the minimum amount and find minimum new path length
             new_path_delay_min = 999999999
             for path in paths:
-                new_output_pin = path[-1]
-                # new_input_pins = self.db_gates[new_output_pin][1:]
-                new_input_pins = self.db_gates[new_output_pin].input_pins
+                new_output_pin = path.pin
+                if new_output_pin not in dd_gates:
+                    dd_gates[new_output_pin] = self.dd_gate(new_output_pin)
 
-                for new_input_pin in new_input_pins:
-                    new_path_delay = self.path_length_T(path+[new_input_pin])
-
-                    if new_path_delay < new_path_delay_min:
-                        new_path_delay_min = new_path_delay
-                        if new_path_delay == path_length + 1:
-                            break
+                # All extensions of a path add the length of the gate at its end.
+                new_path_delay = path.delay + dd_gates[new_output_pin][0]
+                if new_path_delay < new_path_delay_min:
+                    new_path_delay_min = new_path_delay
 
             # Extend all paths that will increase its delay to new_path_delay_min, and cull unnecessary paths.
             # If at least one path terminates at an input pin, paths can be culled using the following criteria. If the
@@ -612,159 +1426,245 @@ class Pathset(object):
 
             # Go through each node and recreate the list of paths, except those which should be culled.
             for path in paths:
-                output_pin = path[-1]
-                output_value = self.db_node_values[output_pin]
-                gate = self.db_gates[output_pin].gate
-                input_pins = self.db_gates[output_pin].input_pins
-                input_values = [self.db_node_values[pin] for pin in input_pins]
-                min_max = self.dd_path_minmax(gate, output_value)
-
                 # Keep paths that are delay-defining and remove others
-                dd_value = self.dd_path_value(gate, input_values)
-                input_pins = [pin for pin in input_pins if self.db_node_values[pin] in dd_value]
+                gate_length, min_max, input_pins, circuit_input_pins = dd_gates[path.pin]
+
+                # Make a list of pins that are input pins and have delay equal to new_path_delay, i.e. special. The
+                # delay is that of path_length_T([path+[pin]]), i.e. of a list holding a single path, which is 0.
+                special_pins = circuit_input_pins if path_length == 0 else []
 
-                # Make a list of pins that are input pins and have delay equal to new_path_delay, i.e. special
-                special_pins = []
-                for pin in input_pins:
-                    if pin in self.db_input_pins and self.path_length_T([path+[pin]]) == path_length:
-                        special_pins += [pin]
+                new_path_delay = path.delay + gate_length
 
                 # If special pins exist, paths can be culled based on min/max condition
                 if any(special_pins):
                     if min_max == "min":
-                        for input_pin in special_pins:
-                            new_paths += [path+[input_pin]]
+                        new_paths += store.extend(path, special_pins, new_path_delay)
                     elif min_max == "max":
-                        for input_pin in input_pins:
-                            if input_pin not in special_pins:
-                                new_paths += [path+[input_pin]]
                         # All pins are input pins and are therefore max path delay.
-                        if not any(new_paths):
-                            for input_pin in input_pins:
-                                new_paths += [path+[input_pin]]
+                        if not new_paths and all(input_pin in special_pins for input_pin in input_pins):
+                            new_paths += store.extend(path, input_pins, new_path_delay)
+                        else:
+                            new_paths += store.extend(path, [input_pin for input_pin in input_pins
+                                                             if input_pin not in special_pins], new_path_delay)
                     elif min_max == "either":
-                        for input_pin in input_pins:
-                            new_paths += [path+[input_pin]]
+                        new_paths += store.extend(path, input_pins, new_path_delay)
+                    else:
+                        store.extend(path, [], new_path_delay)
                 else:
-                    for input_pin in input_pins:
-                        new_paths += [path+[input_pin]]
+                    new_paths += store.extend(path, input_pins, new_path_delay)
 
             # Go through paths in paths and saved_paths to make a list of cull paths that are unnecessary due to min/max
             # conditions. Branch points are found as changes in the number of universal appearances of a node along a
-            # single path.
-
-            # Calculate universal number of occurrences of all nodes
-            node_occurrence = {}
-            for path in new_paths + save_paths:
-                for pin in path:
-                    if pin in node_occurrence:
-                        node_occurrence[pin] += 1
-                    else:
-                        node_occurrence[pin] = 1
+            # single path. The universal numbers of occurrences of all nodes are those kept in store.
+            node_occurrence = store.occurrences
 
-            # Determine branch nodes
-            branch_nodes = []
+            # Determine branch nodes. A walk up the prefix tree stops at a node that an earlier walk reached with no
+            # larger sum_node_occurrence, as it would then only find branch nodes that the earlier walk found.
+            branch_nodes = {}
+            sum_node_occurrences = {}
             for path in new_paths + save_paths:
                 sum_node_occurrence = 1
-                for pin in reversed(path):
+                node = path
+                while (node is not None and
+                       sum_node_occurrences.get(node, sum_node_occurrence + 1) > sum_node_occurrence):
+                    sum_node_occurrences[node] = sum_node_occurrence
+                    pin = node.pin
                     if node_occurrence[pin] > sum_node_occurrence:
                         if pin not in branch_nodes and pin not in self.db_input_pins:
-                            branch_nodes += [pin]
+                            branch_nodes[pin] = node_occurrence[pin]
                         sum_node_occurrence = node_occurrence[pin]
+                    node = node.parent
 
             # Order branch nodes in reverse order, starting farthest from the output pin in path delay. Branch nodes
             # that are closes to the output pin are evaluated last. Do so by reverse ordering branch nodes by their
-            # node occurrence calculated above.
+            # node occurrence calculated above, before any paths are culled.
 
-            branch_nodes = sorted(branch_nodes, key=lambda node: node_occurrence[node])
+            branch_nodes = sorted(branch_nodes, key=lambda node: branch_nodes[node])
 
             # For each branch node, go through any relevant paths and determine if they can be culled based on min/max
-            # condition
-
-            max_path_delay = 0
+            # condition. Culled paths are removed from store, so only the paths through the branch node are touched.
 
-            temp_cull_paths = []
+            # Paths are culled by identity; equal paths are culled together, as their delays are equal.
             for branch_node in branch_nodes:
 
-                # print('branch node: ', branch_node)
-                minmax = self.dd_path_minmax(self.db_gates[branch_node].gate, self.db_node_values[branch_node])
+                if branch_node not in dd_gates:
+                    dd_gates[branch_node] = self.dd_gate(branch_node)
+                minmax = dd_gates[branch_node][1]
+
+                # Path delays from the branch node, i.e. path_length_T(path[branch_point:]), of paths through it.
+                # The paths through the branch node are those below its nodes in the prefix tree, less culled paths.
+                branch_paths = []
+                for branch in store.pin_nodes[branch_node]:
+                    if store.counts[branch]:
+                        branch_paths += [(path, path.delay - branch.delay) for path in store.branch_paths(branch)]
 
                 if minmax == "max":
-                    max_path_delay = 0
-                    for path in new_paths+save_paths:
-                        if branch_node in path:
-                            branch_point = path.index(branch_node)
-                            if self.path_length_T(path[branch_point:]) > max_path_delay:
-                                max_path_delay = self.path_length_T(path[branch_point:])
-                                # print('!!!max', path, '-', max_path_delay)
-                    for path in new_paths+save_paths:
-                        if branch_node in path:
-                            branch_point = path.index(branch_node)
-                            if self.path_length_T(path[branch_point:]) < max_path_delay:
-                                temp_cull_paths += [path]
-                                # print('cull max', max_path_delay, ' ', self.path_length_T(path[branch_point:]))
-                                # print(path)
+                    max_path_delay = max((delay for path, delay in branch_paths), default=0)
+                    for path, delay in branch_paths:
+                        if delay < max_path_delay:
+                            store.remove(path)
                 elif minmax == "min":
-                    min_path_delay = 999999999999
-                    for path in new_paths+save_paths:
-                        if branch_node in path:
-                            branch_point = path.index(branch_node)
-                            if self.path_length_T(path[branch_point:]) < min_path_delay:
-                                min_path_delay = self.path_length_T(path[branch_point:])
-                                # print('!!!min', path, '-', min_path_delay)
-                    for path in new_paths+save_paths:
-                        if branch_node in path:
-                            branch_point = path.index(branch_node)
-                            if self.path_length_T(path[branch_point:]) > min_path_delay:
-                                temp_cull_paths += [path]
-                                # print('cull min', min_path_delay, ' ', self.path_length_T(path[branch_point:]))
-                                # print(path)
-
-                # Remove cull paths from new_paths
-                new_paths = [path for path in new_paths if path not in temp_cull_paths]
-
-                # Remove cull paths from save_paths
-                save_paths = [path for path in save_paths if path not in temp_cull_paths]
-
-            # Replace paths with newly generated new_paths. If paths end on an input pin, they should have been vetted:
-            # pass on to save_paths.
+                    min_path_delay = min((delay for path, delay in branch_paths), default=0)
+                    for path, delay in branch_paths:
+                        if delay > min_path_delay:
+                            store.remove(path)
+
+            # Remove cull paths from new_paths and save_paths. Replace paths with newly generated new_paths. If paths
+            # end on an input pin, they should have been vetted: pass on to save_paths.
+            save_paths = [path for path in save_paths if path in store.paths]
             paths = []
             for path in new_paths:
-                if path[-1] in self.db_input_pins:
-                    save_paths += [path]
-                else:
-                    paths += [path]
+                if path in store.paths:
+                    if path.pin in self.db_input_pins:
+                        save_paths += [path]
+                    else:
+                        paths += [path]
 
-        # Save result to db_results if does not already exist.
-        input_pin_list_sorted = sorted(self.db_input_pins, key=lambda number: int(number[1:]))
+        return [path.path() for path in save_paths]
+
+    def dd_paths_outputs(self, output_pins=None, save_results=True):
+        """
+        Determines the delay-defining paths of several output pins for the node values in db_node_values, as
+        dd_paths_iterative([[output_pin]]) for each output pin. The properties of the gates in the shared fanin cones of
+        the output pins (see dd_gate) are determined once and reused for all output pins.
+
+        Only the gate properties are shared: the paths of each output pin are enumerated by their own dd_paths_expand,
+        as results of sub-paths cannot be reused across output pins. Which paths dd_paths_expand culls at a branch node
+        depends on all the paths of the expansion through it, including those from other branches of the same output
+        pin, so the paths of a sub-path are not the same in the expansions of different output pins. Results of the same
+        values of the input pins of a fanin cone are reused through db_dd_cache, see dd_result().
+
+        output_pins: list of output pins to analyze; by default, all output pins.
+        save_results: If True, add results to db_results if they do not already exist, as add_db_result().
+
+        Returns a list of db_results, in order of output_pins.
+        """
+
+        if output_pins is None:
+            output_pins = list(self.db_output_pins)
+
+        input_string = self.input_string()
+        dd_gates = {}
+
+        results = [self.dd_result(output_pin, input_string, dd_gates) for output_pin in output_pins]
+
+        if save_results:
+            results_written = {(result.input_string, result.output_pin) for result in self.db_results}
+            for result in results:
+                if (result.input_string, result.output_pin) not in results_written:
+                    results_written.add((result.input_string, result.output_pin))
+                    self.save_db_result(result)
+
+        return results
+
+    def input_string(self):
+        """
+        Returns the input string of the current input pin values in db_node_values, i.e. the values of the input pins
+        in natural order, e.g. '10010'.
+        """
+
+        input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
         input_string = ''
         for k in input_pin_list_sorted:
             input_string += str(self.db_node_values[k])
 
+        return input_string
+
+    def add_db_result(self, save_paths, input_string=None):
+        """
+        Save result of the delay-defining paths save_paths to db_results if does not already exist.
+
+        save_paths: list of delay-defining paths, as returned by dd_paths_expand.
+        input_string: input string of the result; by default, that of the current values in db_node_values.
+        """
+
+        if input_string is None:
+            input_string = self.input_string()
+
         if not any([result for result in self.db_results if result.input_string == input_string and
                     result.output_pin == save_paths[0][0]]):
 
-            db_results_entry = self.db_result('', '', '', '', '', [], [])
+            self.save_db_result(self.make_db_result(save_paths, input_string))
+
+    def make_db_result(self, save_paths, input_string):
+        """
+        Returns a db_result of the delay-defining paths save_paths, given the node values in db_node_values.
+
+        save_paths: list of delay-defining paths, as returned by dd_paths_expand.
+        input_string: input string of the result.
+        """
+
+        db_results_entry = self.db_result('', '', '', '', '', [], [])
+
+        db_results_entry.input_string = input_string
+
+        db_results_entry.output_pin = save_paths[0][0]
+
+        db_results_entry.output_pin_value = self.db_node_values[save_paths[0][0]]
+
+        branch_point = self.branch_point(save_paths)
+        branch_node = save_paths[0][branch_point]
+        minmax = self.dd_path_minmax(self.db_gates[branch_node].gate, self.db_node_values[branch_node])
+        db_results_entry.minmax = minmax
+
+        db_results_entry.path_delay = self.path_length_T(save_paths[-1])
+
+        db_results_entry.paths = save_paths
+
+        self.covered_nodes(save_paths)
+        db_results_entry.covered_nodes = self.db_covered_nodes
+        db_results_entry.covered_bits = self.covered_bits(self.db_covered_nodes)
+
+        return db_results_entry
 
-            db_results_entry.input_string = input_string
+    def dd_results_batch(self, output_pins=None, input_strings=None):
+        """
+        Determines the results of output pins for all vectors of db_node_bitmaps, or of input_strings, and returns their
+        path delays, min/max conditions, and covered nodes as arrays. Each vector is analyzed with dd_paths_outputs(),
+        so the results are those of dd_paths_iterative, and results of the same values of the input pins in the fanin
+        cone of an output pin are reused through db_dd_cache. Results are not added to db_results.
+
+        output_pins: list of output pins to analyze; by default, all output pins in natural order.
+        input_strings: list of input strings of the vectors to analyze instead of those of db_node_bitmaps, which is
+        then left unchanged. The vectors are applied with update_db_node_values().
+
+        db_node_values holds the values of the last vector afterwards.
 
-            db_results_entry.output_pin = save_paths[0][0]
+        Returns a 3tuple of NumPy arrays, each indexed by (index of output pin in output_pins, vector):
+        path delays; min/max conditions as strings 'min', 'max', or 'either'; and bitsets of covered nodes, packed into
+        uint8 arrays, in which node k is covered if bit k % 8 of byte k // 8 is set, with k the netlist pin ID.
+        """
+
+        import numpy
 
-            db_results_entry.output_pin_value = self.db_node_values[save_paths[0][0]]
+        if output_pins is None:
+            output_pins = self.netlist.natural_sorted(self.db_output_pins)
 
-            branch_point = self.branch_point(save_paths)
-            branch_node = save_paths[0][branch_point]
-            minmax = self.dd_path_minmax(self.db_gates[branch_node].gate, self.db_node_values[branch_node])
-            db_results_entry.minmax = minmax
+        if input_strings is None:
+            num_vectors = self.db_num_vectors
+        else:
+            num_vectors = len(input_strings)
+            input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
 
-            db_results_entry.path_delay = self.path_length_T(save_paths[-1])
+        num_bytes = (len(self.netlist.pins) + 7) // 8
+        path_delays = numpy.zeros((len(output_pins), num_vectors), dtype=numpy.int64)
+        minmax = numpy.zeros((len(output_pins), num_vectors), dtype=object)
+        coverage = numpy.zeros((len(output_pins), num_vectors, num_bytes), dtype=numpy.uint8)
 
-            db_results_entry.paths = save_paths
+        for vector in range(num_vectors):
+            if input_strings is None:
+                self.make_db_node_values_bitmaps(vector)
+            else:
+                self.update_db_node_values({pin: int(value) for pin, value in
+                                            zip(input_pin_list_sorted, input_strings[vector])})
 
-            self.covered_nodes(save_paths)
-            db_results_entry.covered_nodes = self.db_covered_nodes
+            for k, result in enumerate(self.dd_paths_outputs(output_pins, save_results=False)):
+                path_delays[k, vector] = result.path_delay
+                minmax[k, vector] = result.minmax
+                coverage[k, vector] = numpy.frombuffer(result.covered_bits.to_bytes(num_bytes, 'little'),
+                                                       dtype=numpy.uint8)
 
-            self.db_results += [db_results_entry]
+        return path_delays, minmax, coverage
 
     def covered_nodes(self, result):
         """
@@ -784,7 +1684,7 @@ class Pathset(object):
             covered_nodes = [node for path in result for node in path[branch_point:]]
         if minmax == "either":
             covered_nodes = [node for path in result for node in path]
-        covered_nodes = sorted(list(set(covered_nodes)), key=lambda number: int(number[1:]))
+        covered_nodes = self.netlist.natural_sorted(set(covered_nodes))
         minmax = result[0]
 
         if minmax == "max":
@@ -792,11 +1692,75 @@ class Pathset(object):
         if minmax == "min":
             covered_nodes = [node for path in result[1:] for node in path[branch_point:]]
 
-        covered_nodes = list(set(covered_nodes))
-        covered_nodes = sorted(list(set(covered_nodes)), key=lambda number: int(number[1:]))
+        covered_nodes = self.netlist.natural_sorted(set(covered_nodes))
 
         self.db_covered_nodes = covered_nodes
 
+    def covered_bits(self, nodes):
+        """
+        Returns the integer bitset of a list of nodes, in which bit k is set if the node of netlist pin ID k is in the
+        list. Nodes which are not in the netlist are left out.
+        """
+
+        pin_id = self.netlist.pin_id
+        bits = 0
+        for node in nodes:
+            if node in pin_id:
+                bits |= 1 << pin_id[node]
+
+        return bits
+
+    def save_db_result(self, result):
+        """
+        Add a result to db_results, and its covered nodes to db_covered_bits, db_num_covered, and db_node_hits. Note
+        that results are not checked for duplicates.
+        """
+
+        self.db_results += [result]
+
+        if len(self.db_node_hits) != len(self.netlist.pins):
+            self.db_node_hits = [0] * len(self.netlist.pins)
+
+        bits = result.covered_bits
+        new_bits = bits & ~self.db_covered_bits
+        if new_bits:
+            self.db_covered_bits |= new_bits
+            self.db_num_covered += bin(new_bits).count('1')
+
+        while bits:
+            low_bit = bits & -bits
+            self.db_node_hits[low_bit.bit_length() - 1] += 1
+            bits ^= low_bit
+
+    def coverage(self):
+        """
+        Returns the fraction of the nodes of the netlist which are covered by the results in db_results.
+        """
+
+        if not self.netlist.pins:
+            return 0.0
+
+        return self.db_num_covered / len(self.netlist.pins)
+
+    def uncovered_nodes(self):
+        """
+        Returns the list of the nodes of the netlist which are not covered by any result in db_results, in order of
+        netlist pin ID.
+        """
+
+        return [pin for k, pin in enumerate(self.netlist.pins) if not (self.db_covered_bits >> k) & 1]
+
+    def node_hits(self, node):
+        """
+        Returns the number of results in db_results which cover node, or 0 if node is not in the netlist.
+        """
+
+        pin = self.netlist.pin_id.get(node)
+        if pin is None or not self.db_node_hits:
+            return 0
+
+        return self.db_node_hits[pin]
+
     def write_results(self):
         """
         Write results to file. The results are saved to ..\results and a name of the form c17_results.txt.
@@ -826,7 +1790,7 @@ class Pathset(object):
         if file_line[:11] != 'input list:':
             file_results.close()
 
-            input_pin_list_sorted = sorted(self.db_input_pins, key=lambda number: int(number[1:]))
+            input_pin_list_sorted = self.netlist.natural_sorted(self.db_input_pins)
             file_results = open('results/' + self.circuit + '_results.txt', "a+")
             file_results.write('input list: ' + ','.join(pin for pin in input_pin_list_sorted) + '\n' + '\n')
             file_results.close()
@@ -871,6 +1835,11 @@ class Pathset(object):
         Let added pins be numbered as M1, M2, ...
         """
 
+        # Results, fanin cones, and delay bounds of the unmodified circuit no longer hold.
+        self.db_dd_cache.clear()
+        self.db_cone_inputs = {}
+        self.db_delay_bounds = {}
+
         # Only add mods that have not already been added
         for mod in self.db_mods_circuit.array[self.db_mods_circuit.mod_num:]:
 
@@ -880,12 +1849,13 @@ class Pathset(object):
             self.db_node_pins |= set(mod_new_pin_name)
 
             if mod.original_pin in self.db_node_pins | self.db_input_pins:
-                for output_pin in self.db_gates:
+                for output_pin in list(self.db_gates):
                     # De-link old pin from any gate inputs
-                    input_pins = self.db_gates[output_pin].input_pins
-                    if mod.original_pin in input_pins:
-                        self.db_gates[output_pin].input_pins = [pin for pin in self.db_gates[output_pin].input_pins if
-                                                                pin != mod.original_pin] + [mod_new_pin_name]
+                    gate = self.db_gates[output_pin]
+                    if mod.original_pin in gate.input_pins:
+                        self.db_gates[output_pin] = self.db_gate(gate.gate, [pin for pin in gate.input_pins
+                                                                             if pin != mod.original_pin] +
+                                                                 [mod_new_pin_name])
                 # Link mod gate between mod new pin (as output) and original pin and mod input pins (as inputs)
                 self.db_gates[mod_new_pin_name] = [mod.gate, [mod.original_pin]+[mod.input_pins]]
 
@@ -901,6 +1871,10 @@ class Pathset(object):
         [original pin, [pins to other inputs of inserted gate], gate type as string]
         """
 
+        self.db_dd_cache.clear()
+        self.db_cone_inputs = {}
+        self.db_delay_bounds = {}
+
         for mod_num in range(self.db_mods_circuit.mod_num):
             mod_pin_name = 'M'+str(mod_num+1)
             original_pin = self.db_mods_circuit.array[mod_num].original_pin
@@ -913,11 +1887,12 @@ class Pathset(object):
                         # Remove added mod gate
                         self.db_gates.pop(mod_pin_name)
                         # Remove mod pins and relink with original pin to the original gate
-                        for output_pin in self.db_gates:
-                            if mod_pin_name in self.db_gates[output_pin].input_pins:
-                                self.db_gates[output_pin].input_pins = \
-                                    [pin for pin in self.db_gates[output_pin].input_pins if
-                                     pin != mod_pin_name] + [original_pin]
+                        for output_pin in list(self.db_gates):
+                            gate = self.db_gates[output_pin]
+                            if mod_pin_name in gate.input_pins:
+                                self.db_gates[output_pin] = \
+                                    self.db_gate(gate.gate, [pin for pin in gate.input_pins if
+                                                             pin != mod_pin_name] + [original_pin])
                 except KeyError:
                     print('Mod number ', mod_num, 'does not match mod array. Please check')
 
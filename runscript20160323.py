@@ -6,8 +6,13 @@
 """
 
 import pathsets
+import campaign
 
-def runscript():
+def runscript(processes=1):
+    """
+    processes: Number of worker processes to shard the PRNG vectors over; by default, the vectors are run serially in
+    this process. Results are merged in the same order as a serial run, so they do not depend on processes.
+    """
 
     PRNG_seed = 1
     PRNG_num = 10000
@@ -15,21 +20,6 @@ def runscript():
 
     cake = pathsets.Pathset('c432', 'verilog')
 
-    for PRNG in range(PRNG_num):
-        print("")
-        print('========================')
-        print(PRNG, '/', PRNG_num)
-
-        cake.make_db_node_values('PRNG', PRNG_seed, PRNG+PRNG_offset)
-
-        input_pin_list_sorted = sorted(cake.db_input_pins, key=lambda number: int(number[1:]))
-
-        input_string = ''
-        for k in input_pin_list_sorted:
-            input_string += str(cake.db_node_values[k])
-
-        for outpin in cake.db_output_pins:
-
-            cake.dd_paths_iterative([[outpin]])
+    campaign.run_prng_campaign(cake, PRNG_seed, PRNG_offset, PRNG_num, processes=processes)
 
     cake.write_results()